@@ -0,0 +1,192 @@
+'''
+Microbenchmarks for each stage of the Baguio pipeline.
+
+Run from the project root (the data paths are relative to it):
+
+    python scripts/benchmarks/bench_pipeline.py
+    python scripts/benchmarks/bench_pipeline.py --stages misfit store_seir_apply --repeat 20
+    python scripts/benchmarks/bench_pipeline.py --compare results/benchmarks/<earlier>.json
+    python scripts/benchmarks/bench_pipeline.py --compare    # Against the committed baseline.json
+
+Each benchmark has an untimed setup that returns the callable to time. Results are
+saved as JSON under results/benchmarks/, tagged with the git commit, so runs from
+different commits can be compared. Stages whose input data is missing (the
+observation-based ones need data/baguio_raw.csv) are recorded as skipped.
+'''
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from functools import partial
+
+import covasim as cv
+
+# Add the project root, scripts and calibs folders to sys.path so the pipeline modules can be imported
+SCRIPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+ROOT_DIR = os.path.dirname(SCRIPTS_DIR)
+sys.path.extend([ROOT_DIR, SCRIPTS_DIR, os.path.join(SCRIPTS_DIR, 'calibs')])
+from utils.save_results import save_raw, RAW_DIR
+
+BENCH_DIR = os.path.join(ROOT_DIR, 'results', 'benchmarks')
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baseline.json')
+
+# Population sizes for the construction benchmarks; 366k is full-scale Baguio
+POP_SIZES = {'10k': 10_000, '100k': 100_000, '366k': 366_358}
+
+BENCHMARKS = {}
+
+def benchmark(name, repeat=5):
+    """Register a setup function; it returns the zero-argument callable that gets timed"""
+    def register(setup):
+        BENCHMARKS[name] = dict(setup=setup, repeat=repeat)
+        return setup
+    return register
+
+_fixtures = {}
+
+def fixture(name, make):
+    """Build an expensive input (e.g. a finished sim) once and share it between benchmarks"""
+    if name not in _fixtures:
+        _fixtures[name] = make()
+    return _fixtures[name]
+
+def make_merged_1_sim():
+    from calibrate_baguio import INTERVENTION_PERIODS, base_pars
+    start_date, end_date = INTERVENTION_PERIODS['merged_1']
+    return cv.Sim(pars=dict(base_pars, start_day=start_date, end_day=end_date, verbose=0))
+
+def finished_merged_1_sim():
+    return fixture('merged_1_run', lambda: make_merged_1_sim().run(verbose=0))
+
+def setup_population(pop_size):
+    pars = dict(pop_size=pop_size, pop_type='hybrid', location='philippines', verbose=0)
+    return lambda: cv.Sim(pars=pars).initialize()
+
+for label, pop_size in POP_SIZES.items():
+    benchmark(f'population_{label}', repeat=3 if pop_size < 100_000 else 1)(partial(setup_population, pop_size))
+
+@benchmark('sim_step', repeat=20)
+def setup_sim_step():
+    from seir_counts import make_sim
+    sim = make_sim(verbose=0)
+    sim.initialize()
+    return sim.step
+
+@benchmark('merged_1_run', repeat=3)
+def setup_merged_1_run():
+    return lambda: make_merged_1_sim().run(verbose=0)
+
+@benchmark('misfit', repeat=50)
+def setup_misfit():
+    from misfit import calculate_simulation_misfit
+    sim = finished_merged_1_sim()
+    return lambda: calculate_simulation_misfit(sim)
+
+@benchmark('store_seir_apply', repeat=50)
+def setup_store_seir_apply():
+    from seir_counts import make_sim
+    sim = make_sim(verbose=0)
+    sim.initialize()
+    seir = sim.get_analyzer('seir')
+    return lambda: seir.apply(sim)
+
+@benchmark('save_raw', repeat=3)
+def setup_save_raw():
+    sim = finished_merged_1_sim()
+    def run():
+        with open(os.devnull, 'w') as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                save_raw(sim, 'benchmark')
+            finally:
+                sys.stdout = stdout
+    return run
+
+def time_benchmark(name, repeat=None):
+    """Run one benchmark's setup, then time its callable `repeat` times"""
+    spec = BENCHMARKS[name]
+    repeat = repeat or spec['repeat']
+    func = spec['setup']()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return dict(
+        repeat=repeat,
+        min=min(times),
+        median=statistics.median(times),
+        mean=statistics.mean(times),
+        stdev=statistics.stdev(times) if len(times) > 1 else 0.0,
+    )
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def run_benchmarks(stages=None, repeat=None):
+    results = dict(
+        commit=git_commit(),
+        timestamp=datetime.now().isoformat(timespec='seconds'),
+        covasim_version=cv.__version__,
+        benchmarks={},
+    )
+    for name in stages or BENCHMARKS:
+        print(f"⏱️  {name} ...", end=' ', flush=True)
+        try:
+            results['benchmarks'][name] = stats = time_benchmark(name, repeat)
+        except FileNotFoundError as e:
+            results['benchmarks'][name] = dict(skipped=str(e))
+            print(f"skipped ({e})")
+            continue
+        print(f"median {stats['median']*1e3:,.3f} ms (min {stats['min']*1e3:,.3f} ms, n={stats['repeat']})")
+    return results
+
+def save_benchmarks(results):
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filepath = os.path.join(BENCH_DIR, f"bench_{results['commit']}_{stamp}.json")
+    with open(filepath, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Benchmark results saved to {filepath}")
+    return filepath
+
+def compare_benchmarks(results, baseline_path):
+    """Print each stage's median time relative to an earlier results file"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nComparison with {baseline['commit']} ({baseline_path}):")
+    for name, stats in results['benchmarks'].items():
+        old = baseline['benchmarks'].get(name)
+        if old is None or 'median' not in old:
+            print(f"{name}: no baseline")
+            continue
+        if 'median' not in stats:
+            print(f"{name}: skipped")
+            continue
+        ratio = stats['median'] / old['median']
+        print(f"{name}: {old['median']*1e3:,.3f} ms -> {stats['median']*1e3:,.3f} ms ({ratio:.2f}x)")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the Baguio pipeline stages')
+    parser.add_argument('--stages', nargs='+', choices=list(BENCHMARKS.keys()), help='Stages to run (default: all)')
+    parser.add_argument('--repeat', type=int, help='Override the number of timed repetitions')
+    parser.add_argument('--compare', nargs='?', const=BASELINE_FILE,
+                        help='Earlier results JSON to compare against (default: results/benchmarks/baseline.json)')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.stages, args.repeat)
+    save_benchmarks(results)
+    if args.compare:
+        compare_benchmarks(results, args.compare)
+    # Remove the file written by the save_raw benchmark
+    for filename in os.listdir(RAW_DIR):
+        if filename.startswith('benchmark_'):
+            os.remove(RAW_DIR / filename)
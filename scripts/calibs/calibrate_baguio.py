@@ -4,29 +4,29 @@ import optuna as op
 import sciris as sc
 import pandas as pd
 import os
-from misfit import calculate_simulation_misfit, smoothed_cases, smoothed_deaths, full_index
+from misfit import get_misfit_window
 from datetime import datetime
 import sys
+import argparse
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import lru_cache
+from itertools import repeat
 import matplotlib.pyplot as plt
+from emulator import optimize_with_emulator
+
+# Add the project root to sys.path so Python can find utils
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.population_cache import PopulationCache
+from utils.schedule import schedule_periods, calibration_periods
 
 # Output folder for independent period calibrations
 OUTPUT_DIR = 'period_calibration_independent'
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 # Define intervention periods
-INTERVENTION_PERIODS = {
-    'merged_1': ('2020-03-02', '2021-03-02'),
-
-    'ecq': ('2020-03-02', '2020-05-15'),
-    'gcq': ('2020-05-16', '2020-05-31'),
-    'mgcq': ('2020-06-01', '2021-01-31'),
-    'gcq2': ('2021-02-01', '2021-10-31'),
-    'al3': ('2021-11-01', '2021-12-05'),
-    'al2_1': ('2021-12-06', '2022-01-09'),
-    'al3_2': ('2022-01-10', '2022-02-16'),
-    'al2_2': ('2022-02-17', '2022-03-01'),
-    'al1': ('2022-03-02', '2022-03-15'),
-}
+INTERVENTION_PERIODS = calibration_periods()  # Schedule periods plus the merged_1 and shortened al1 windows
 
 # play around these params
 PERIOD_PARAMS = dict(
@@ -34,6 +34,19 @@ PERIOD_PARAMS = dict(
     rel_death_prob=[0.5, 0.6],
 )
 
+# Consecutive periods, in order, for chained calibration
+CHAIN_PERIODS = list(schedule_periods().keys())
+
+# Days simulated between partial-misfit reports to the pruner
+PRUNE_EVERY = 14
+
+# Common random numbers: every trial is scored on the same seeds, starting from
+# covasim's default seed (so a single seed reproduces the plain objective)
+CRN_SEED_BASE = 1
+
+# How per-seed misfits are combined into a trial's objective value
+SEED_STATISTICS = dict(mean=np.mean, median=np.median)
+
 # Base simulation parameters
 base_pars = dict(
     pop_size=10e3,
@@ -44,6 +57,10 @@ base_pars = dict(
     rescale=True,
 )
 
+# Populations only depend on (pop_size, pop_type, location, seed), not on the
+# calibrated parameters, so trials reuse one prebuilt population per process
+POP_CACHE = PopulationCache(maxsize=2)
+
 def analyze_trials(study, period_name, timestamp):
     """Analyze and visualize trial results"""
     trials_df = pd.DataFrame([
@@ -51,10 +68,15 @@ def analyze_trials(study, period_name, timestamp):
             'trial': t.number,
             'beta': t.params['beta'],
             'rel_death_prob': t.params['rel_death_prob'],
-            'misfit': t.value
+            **{name: value for name, value in t.params.items() if name not in ('beta', 'rel_death_prob')},
+            'misfit': t.value,
+            'source': t.user_attrs.get('source', 'sampler'),
+            'emulator_misfit': t.user_attrs.get('emulator_misfit'),
         }
         for t in study.trials
+        if t.state == op.trial.TrialState.COMPLETE
     ])
+    n_pruned = sum(t.state == op.trial.TrialState.PRUNED for t in study.trials)
     
     # Save raw trial data
     trials_df.to_csv(os.path.join(OUTPUT_DIR, f'trials_{period_name}_{timestamp}.csv'), index=False)
@@ -80,14 +102,181 @@ def analyze_trials(study, period_name, timestamp):
     
     # Print summary statistics
     print("\nTrial Analysis Summary:")
-    print(f"Number of trials: {len(trials_df)}")
+    print(f"Number of trials: {len(trials_df)} completed, {n_pruned} pruned")
     print("\nBest 5 trials:")
     print(trials_df.nsmallest(5, 'misfit'))
     print("\nParameter ranges for best 5 trials:")
     print(f"Beta range: {trials_df.nsmallest(5, 'misfit')['beta'].min():.6f} to {trials_df.nsmallest(5, 'misfit')['beta'].max():.6f}")
     print(f"Rel death prob range: {trials_df.nsmallest(5, 'misfit')['rel_death_prob'].min():.6f} to {trials_df.nsmallest(5, 'misfit')['rel_death_prob'].max():.6f}")
 
-def calibrate_period(period_name, n_trials):
+def crn_seeds(n_seeds):
+    """The fixed seeds shared by all trials"""
+    return list(range(CRN_SEED_BASE, CRN_SEED_BASE + n_seeds))
+
+@lru_cache(maxsize=1)
+def load_snapshot(snapshot_path):
+    """Load a paused chain sim once per process; callers copy it"""
+    return cv.load(snapshot_path)
+
+def make_period_sim(period_name, snapshot=None, seed=None):
+    """Initialized sim for a period: a fresh sim over its window, or a copy of a paused chain sim"""
+    if snapshot is not None:
+        sim = sc.dcp(snapshot)
+        if seed is not None:
+            sim['rand_seed'] = seed  # run_period reseeds from this when the run resumes
+        return sim
+    start_date, end_date = INTERVENTION_PERIODS[period_name]
+    period_pars = base_pars.copy()
+    period_pars.update({'start_day': start_date, 'end_day': end_date})
+    if seed is not None:
+        period_pars['rand_seed'] = seed
+    sim = POP_CACHE.make_sim(period_pars)
+    sim.initialize()
+    return sim
+
+def chunk_seed(sim):
+    """
+    Seed for the chunk a sim is about to run, derived from its rand_seed and current
+    day. Covasim draws from one global stream, so reseeding every chunk is what keeps
+    each replicate's trajectory independent of the others it is interleaved with.
+    """
+    state = np.random.SeedSequence([int(sim['rand_seed']), int(sim.t)]).generate_state(1)[0]
+    return int(state >> 1)  # Covasim's numba seed is a 32-bit signed int
+
+def run_period(sim, period_name, trial=None, window=None, prune_every=PRUNE_EVERY, statistic='mean'):
+    """
+    Advance the sim (or a list of seed replicates, in lockstep) to the end of the
+    period, in chunks of prune_every days. Each chunk is reseeded from chunk_seed(),
+    so a seed gives the same trajectory run alone, in lockstep or in a pool. With a
+    trial, the partial misfit (combined over replicates) is reported after each
+    chunk so the pruner can stop hopeless trials.
+    """
+    sims = sc.tolist(sim)
+    until = min(sims[0].day(INTERVENTION_PERIODS[period_name][1]) + 1, sims[0].npts)
+    t0 = sims[0].t
+    while sims[0].t < until:
+        stop = min(sims[0].t + prune_every, until)
+        for s in sims:
+            cv.utils.set_seed(chunk_seed(s))  # Not s.set_seed(), which would overwrite rand_seed
+            s.run(until=stop, reset_seed=False, verbose=0)
+        if stop >= until:
+            break
+        if trial is None:
+            continue
+        partial = SEED_STATISTICS[statistic]([window.score_partial(s) for s in sims])
+        trial.report(partial, step=stop - t0)
+        if trial.should_prune():
+            raise op.TrialPruned()
+    return sim
+
+def score_seed(period_name, params, seed, snapshot_path=None):
+    """Run one seed of a parameter set to the end of the period and return its misfit (for a process pool)"""
+    start_date, end_date = INTERVENTION_PERIODS[period_name]
+    snapshot = load_snapshot(snapshot_path) if snapshot_path else None
+    sim = make_period_sim(period_name, snapshot, seed=seed)
+    sim.update_pars(params)
+    run_period(sim, period_name)
+    return get_misfit_window(start_date, end_date).score_partial(sim)
+
+def seed_executor(seed_workers):
+    """Process pool for running a trial's seeds in parallel, or a no-op context to run them in lockstep"""
+    return ProcessPoolExecutor(seed_workers) if seed_workers > 1 else nullcontext()
+
+def make_objective(period_name, prune_every=PRUNE_EVERY, snapshot_path=None, n_seeds=1, statistic='mean', executor=None):
+    """
+    Build the Optuna objective for a single intervention period. Each trial is
+    scored on the same n_seeds seeds (common random numbers) and the per-seed
+    misfits are combined with the statistic. With an executor the seeds run in
+    parallel, without intermediate reports to the pruner; otherwise they run in
+    lockstep and can be pruned.
+    """
+    start_date, end_date = INTERVENTION_PERIODS[period_name]
+    window = get_misfit_window(start_date, end_date)
+    snapshot = load_snapshot(snapshot_path) if snapshot_path else None
+    seeds = crn_seeds(n_seeds)
+    POP_CACHE.maxsize = max(POP_CACHE.maxsize, n_seeds)  # Keep one population per seed
+
+    def objective(trial):
+        # Suggest parameters
+        params = {name: trial.suggest_float(name, *bounds) for name, bounds in PERIOD_PARAMS.items()}
+        if executor is not None:
+            misfits = list(executor.map(score_seed, repeat(period_name), repeat(params), seeds, repeat(snapshot_path)))
+        else:
+            sims = [make_period_sim(period_name, snapshot, seed=seed) for seed in seeds]
+            for sim in sims:
+                sim.update_pars(params)
+            run_period(sims, period_name, trial, window, prune_every, statistic)
+            misfits = [window.score_partial(sim) for sim in sims]
+        # Combine the misfits for this period
+        if n_seeds > 1:
+            trial.set_user_attr('seed_misfits', [float(m) for m in misfits])
+        return float(SEED_STATISTICS[statistic](misfits))
+
+    return objective
+
+def make_sampler(seed=None):
+    return op.samplers.TPESampler(n_startup_trials=5, n_ei_candidates=12, seed=seed)
+
+def make_pruner(name='median'):
+    if name == 'median':
+        return op.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=PRUNE_EVERY)
+    elif name == 'halving':
+        return op.pruners.SuccessiveHalvingPruner(min_resource=PRUNE_EVERY)
+    return op.pruners.NopPruner()
+
+def make_journal_storage(path):
+    """Journal-file storage; unlike SQLite it is safe with several worker processes"""
+    try:
+        from optuna.storages.journal import JournalFileBackend
+    except ImportError:  # Optuna < 4.0
+        from optuna.storages import JournalFileStorage as JournalFileBackend
+    return op.storages.JournalStorage(JournalFileBackend(path))
+
+def run_worker(period_name, study_name, storage_path, n_trials, seed, pruner='median', snapshot_path=None,
+               n_seeds=1, statistic='mean', seed_workers=1):
+    """
+    Worker process: attach to the shared study and run its share of the trials.
+    Only the Optuna sampler is seeded per worker; covasim seeds every sim from its rand_seed.
+    """
+    study = op.load_study(
+        study_name=study_name,
+        storage=make_journal_storage(storage_path),
+        sampler=make_sampler(seed),
+        pruner=make_pruner(pruner)
+    )
+    with seed_executor(seed_workers) as executor:
+        objective = make_objective(period_name, snapshot_path=snapshot_path, n_seeds=n_seeds,
+                                   statistic=statistic, executor=executor)
+        study.optimize(objective, n_trials=n_trials)
+
+def run_workers(period_name, study_name, storage_path, n_trials, n_workers, seed=0, pruner='median', snapshot_path=None,
+                n_seeds=1, statistic='mean', seed_workers=1):
+    """Split n_trials across n_workers processes, each with its own sampler seed"""
+    shares = [n_trials // n_workers + (i < n_trials % n_workers) for i in range(n_workers)]
+    procs = []
+    for i, share in enumerate(shares):
+        if share == 0:
+            continue
+        proc = mp.Process(target=run_worker, args=(period_name, study_name, storage_path, share, seed + i, pruner,
+                                                   snapshot_path, n_seeds, statistic, seed_workers))
+        proc.start()
+        procs.append(proc)
+    for proc in procs:
+        proc.join()
+    failed = [proc.exitcode for proc in procs if proc.exitcode != 0]
+    if failed:
+        print(f"Warning: {len(failed)} of {len(procs)} workers exited with errors (exit codes: {failed})")
+
+def calibrate_period(period_name, n_trials, n_workers=1, seed=0, pruner='median', snapshot_path=None,
+                     n_seeds=1, statistic='mean', seed_workers=1, emulator=False):
+    """
+    Calibrate one period and save its best sim. With snapshot_path, trials start
+    from that saved (paused) sim instead of a fresh population. With n_seeds > 1,
+    each trial is scored by the statistic of its misfits over the same seeds,
+    run on seed_workers processes. With emulator, a surrogate fitted to the
+    completed trials picks each trial after the first few (in one process).
+    Returns the path of the saved final sim.
+    """
     if period_name not in INTERVENTION_PERIODS:
         print(f"Error: Period '{period_name}' not found. Available periods: {list(INTERVENTION_PERIODS.keys())}")
         sys.exit(1)
@@ -95,33 +284,38 @@ def calibrate_period(period_name, n_trials):
     start_date, end_date = INTERVENTION_PERIODS[period_name]
     print(f"\nCalibrating period: {period_name.upper()} ({start_date} to {end_date})")
 
-    def objective(trial):
-        # Suggest parameters
-        beta = trial.suggest_float('beta', *PERIOD_PARAMS['beta'])
-        rel_death_prob = trial.suggest_float('rel_death_prob', *PERIOD_PARAMS['rel_death_prob'])
-        # Set up sim
-        period_pars = base_pars.copy()
-        period_pars.update({'start_day': start_date, 'end_day': end_date})
-        sim = cv.Sim(pars=period_pars)
-        sim.update_pars({'beta': beta, 'rel_death_prob': rel_death_prob})
-        sim.run(verbose=0)
-        # Calculate misfit for this period
-        period_misfit = calculate_simulation_misfit(sim)
-        return period_misfit
-
     # Set up Optuna study
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     study_name = f'calib_{period_name}_{timestamp}'
-    storage = f'sqlite:///{OUTPUT_DIR}/calib_{period_name}_{timestamp}.db'
-    sampler = op.samplers.TPESampler(n_startup_trials=5, n_ei_candidates=12)
+    if emulator and n_workers > 1:
+        print("The emulator proposes trials one at a time; ignoring --workers (use --seed-workers instead)")
+        n_workers = 1
+    if n_workers > 1:
+        storage_path = os.path.join(OUTPUT_DIR, f'calib_{period_name}_{timestamp}.log')
+        storage = make_journal_storage(storage_path)
+    else:
+        storage = f'sqlite:///{OUTPUT_DIR}/calib_{period_name}_{timestamp}.db'
     study = op.create_study(
         study_name=study_name,
         storage=storage,
         load_if_exists=False,
         direction='minimize',
-        sampler=sampler
+        sampler=make_sampler(),
+        pruner=make_pruner(pruner)
     )
-    study.optimize(objective, n_trials=n_trials, n_jobs=1)
+    if n_workers > 1:
+        print(f"Running {n_trials} trials on {n_workers} worker processes")
+        run_workers(period_name, study_name, storage_path, n_trials, n_workers, seed=seed, pruner=pruner,
+                    snapshot_path=snapshot_path, n_seeds=n_seeds, statistic=statistic, seed_workers=seed_workers)
+        study = op.load_study(study_name=study_name, storage=storage)
+    else:
+        with seed_executor(seed_workers) as executor:
+            objective = make_objective(period_name, snapshot_path=snapshot_path, n_seeds=n_seeds,
+                                       statistic=statistic, executor=executor)
+            if emulator:
+                optimize_with_emulator(study, objective, n_trials, PERIOD_PARAMS, seed=seed)
+            else:
+                study.optimize(objective, n_trials=n_trials, n_jobs=1)
 
     # Analyze and visualize results
     analyze_trials(study, period_name, timestamp)
@@ -137,28 +331,66 @@ def calibrate_period(period_name, n_trials):
         'start_date': start_date,
         'end_date': end_date,
         **best_params,
-        'misfit': best_value
+        'misfit': best_value,
+        'seeds': crn_seeds(n_seeds),
+        'seed_statistic': statistic,
     }
     sc.savejson(os.path.join(OUTPUT_DIR, f'best_params_{period_name}_{timestamp}.json'), result, indent=2)
     
-    # Save final sim state
-    period_pars = base_pars.copy()
-    period_pars.update({'start_day': start_date, 'end_day': end_date})
-    sim = cv.Sim(pars=period_pars)
+    # Save final sim state (a paused chain sim keeps its people so the next period can resume it)
+    sim = make_period_sim(period_name, load_snapshot(snapshot_path) if snapshot_path else None)
     sim.update_pars(best_params)
-    sim.run(verbose=0)
-    sim.save(os.path.join(OUTPUT_DIR, f'final_sim_{period_name}_{timestamp}.sim'))
+    run_period(sim, period_name)
+    sim_path = os.path.join(OUTPUT_DIR, f'final_sim_{period_name}_{timestamp}.sim')
+    sim.save(sim_path, keep_people=not sim.complete)
     print(f"Saved best parameters and final sim for {period_name} to {OUTPUT_DIR}")
+    return sim_path
+
+def calibrate_chain(n_trials, n_workers=1, seed=0, pruner='median', periods=CHAIN_PERIODS,
+                    n_seeds=1, statistic='mean', seed_workers=1, emulator=False):
+    """
+    Calibrate consecutive periods on one timeline. Each period starts from the best
+    sim of the previous one, paused at its end day, so only its own window is simulated.
+    """
+    chain_pars = base_pars.copy()
+    chain_pars.update({'start_day': INTERVENTION_PERIODS[periods[0]][0],
+                       'end_day': INTERVENTION_PERIODS[periods[-1]][1]})
+    sim = POP_CACHE.make_sim(chain_pars)
+    sim.initialize()
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    snapshot_path = os.path.join(OUTPUT_DIR, f'chain_start_{timestamp}.sim')
+    sim.save(snapshot_path, keep_people=True)
+
+    for period_name in periods:
+        snapshot_path = calibrate_period(period_name, n_trials, n_workers=n_workers, seed=seed,
+                                         pruner=pruner, snapshot_path=snapshot_path, n_seeds=n_seeds,
+                                         statistic=statistic, seed_workers=seed_workers, emulator=emulator)
+    print(f"Chained calibration finished; full-timeline sim saved to {snapshot_path}")
+    return snapshot_path
 
 if __name__ == '__main__':
-    
-    #     if len(sys.argv) != 2:
-    #     print("Usage: python calibrate_period_independent.py <period_name>")
-    #     print(f"Available periods: {list(INTERVENTION_PERIODS.keys())}")
-    #     sys.exit(1)
-    
-    # period = sys.argv[1]
+    parser = argparse.ArgumentParser(description='Calibrate beta and rel_death_prob for one intervention period')
+    parser.add_argument('period', nargs='?', default='merged_1', choices=list(INTERVENTION_PERIODS.keys()))
+    parser.add_argument('--trials', type=int, default=100, help='Total number of Optuna trials')
+    parser.add_argument('--workers', type=int, default=1, help='Number of worker processes sharing the study')
+    parser.add_argument('--seed', type=int, default=0, help='Base seed; worker i uses seed + i')
+    parser.add_argument('--pruner', default='median', choices=['median', 'halving', 'none'],
+                        help=f'Pruner fed with the partial misfit every {PRUNE_EVERY} simulated days')
+    parser.add_argument('--chain', action='store_true',
+                        help=f'Calibrate {", ".join(CHAIN_PERIODS)} in order, handing each best sim state to the next')
+    parser.add_argument('--seeds', type=int, default=1,
+                        help='Score each trial on this many fixed seeds (common random numbers across trials)')
+    parser.add_argument('--seed-stat', default='mean', choices=list(SEED_STATISTICS.keys()),
+                        help='How the per-seed misfits are combined')
+    parser.add_argument('--seed-workers', type=int, default=1,
+                        help='Processes running each trial\'s seeds in parallel (disables pruning)')
+    parser.add_argument('--emulator', action='store_true',
+                        help='Let a Gaussian-process emulator of the misfit pick trials after the first few')
+    args = parser.parse_args()
 
-    # Specify the period to calibrate
-    period = 'merged_1'  # You can change this to any period from INTERVENTION_PERIODS
-    calibrate_period(period, n_trials=100) 
\ No newline at end of file
+    opts = dict(n_seeds=args.seeds, statistic=args.seed_stat, seed_workers=args.seed_workers, emulator=args.emulator)
+    if args.chain:
+        calibrate_chain(n_trials=args.trials, n_workers=args.workers, seed=args.seed, pruner=args.pruner, **opts)
+    else:
+        calibrate_period(args.period, n_trials=args.trials, n_workers=args.workers, seed=args.seed, pruner=args.pruner,
+                         **opts)
@@ -0,0 +1,113 @@
+import numpy as np
+import optuna as op
+
+# Hyperparameter grids searched by marginal likelihood; inputs are scaled to [0, 1]
+LENGTH_SCALES = np.geomspace(0.05, 2.0, 12)
+NOISE_LEVELS = np.array([1e-4, 1e-3, 1e-2, 0.05, 0.2])  # Relative to the standardized output variance
+
+def rbf_kernel(A, B, length_scale):
+    d = (A[:, None, :] - B[None, :, :]) / length_scale
+    return np.exp(-0.5 * (d**2).sum(axis=-1))
+
+class GPEmulator:
+    """
+    Gaussian-process surrogate of log(misfit) over the calibrated parameters.
+
+    Inputs are scaled to the unit box given by the parameter bounds, so the same
+    isotropic RBF kernel works for any number of parameters. The length scale and
+    noise level (the sims are stochastic) are picked on a grid by log marginal
+    likelihood at every fit.
+    """
+
+    def __init__(self, bounds):
+        self.names = list(bounds.keys())
+        self.low = np.array([bounds[name][0] for name in self.names], dtype=float)
+        self.high = np.array([bounds[name][1] for name in self.names], dtype=float)
+        self.X = None
+
+    def scale(self, X):
+        return (np.asarray(X, dtype=float) - self.low) / (self.high - self.low)
+
+    def unscale(self, U):
+        return self.low + U * (self.high - self.low)
+
+    def fit(self, X, misfits):
+        self.X = self.scale(X)
+        y = np.log(np.asarray(misfits, dtype=float))
+        self.y_mean, self.y_std = y.mean(), y.std() or 1.0
+        y = (y - self.y_mean) / self.y_std
+        n = len(y)
+
+        best = -np.inf
+        for length_scale in LENGTH_SCALES:
+            K = rbf_kernel(self.X, self.X, length_scale)
+            for noise in NOISE_LEVELS:
+                try:
+                    L = np.linalg.cholesky(K + noise * np.eye(n))
+                except np.linalg.LinAlgError:
+                    continue
+                alpha = np.linalg.solve(L.T, np.linalg.solve(L, y))
+                lml = -0.5 * y @ alpha - np.log(np.diag(L)).sum()
+                if lml > best:
+                    best = lml
+                    self.length_scale, self.noise, self.L, self.alpha = length_scale, noise, L, alpha
+        return self
+
+    def predict(self, X):
+        """Predicted mean and standard deviation of log(misfit) at X"""
+        U = self.scale(X)
+        Ks = rbf_kernel(U, self.X, self.length_scale)
+        mean = Ks @ self.alpha
+        v = np.linalg.solve(self.L, Ks.T)
+        var = np.clip(1.0 - (v**2).sum(axis=0), 1e-12, None)
+        return self.y_mean + self.y_std * mean, self.y_std * np.sqrt(var)
+
+def completed_trials(study, names):
+    """(X, misfits) arrays of the study's completed trials"""
+    trials = [t for t in study.trials if t.state == op.trial.TrialState.COMPLETE and t.value > 0]
+    X = np.array([[t.params[name] for name in names] for t in trials])
+    return X, np.array([t.value for t in trials])
+
+def propose(emulator, best_x, n_candidates=4096, kappa=2.0, rng=None):
+    """
+    Screen random candidates on the emulator and return the one with the lowest
+    confidence bound (mean - kappa * sd): promising where the mean is low, worth
+    checking where the sd is high. Half the candidates are drawn near the best trial.
+    """
+    rng = np.random.default_rng(rng)
+    d = len(emulator.names)
+    wide = rng.random((n_candidates // 2, d))
+    local = np.clip(emulator.scale(best_x) + 0.05 * rng.standard_normal((n_candidates - len(wide), d)), 0, 1)
+    candidates = emulator.unscale(np.vstack([wide, local]))
+    mean, sd = emulator.predict(candidates)
+    i = np.argmin(mean - kappa * sd)
+    return dict(zip(emulator.names, candidates[i])), mean[i], sd[i]
+
+def optimize_with_emulator(study, objective, n_trials, bounds, n_initial=10, n_candidates=4096, kappa=2.0, seed=None):
+    """
+    Run n_trials real sims on the study, but after the first n_initial (chosen by the
+    study's own sampler) let the emulator pick each next trial from n_candidates
+    screened candidates. Picks are enqueued, so they are ordinary Optuna trials;
+    the emulator's prediction is kept as user attributes.
+    """
+    rng = np.random.default_rng(seed)
+    emulator = GPEmulator(bounds)
+    n_done = len(study.trials)
+    if n_done < n_initial:
+        study.optimize(objective, n_trials=min(n_initial - n_done, n_trials))
+    while len(study.trials) - n_done < n_trials:
+        X, misfits = completed_trials(study, emulator.names)
+        if len(misfits) < 2:  # Not enough to fit; fall back to the sampler
+            study.optimize(objective, n_trials=1)
+            continue
+        emulator.fit(X, misfits)
+        params, mean, sd = propose(emulator, X[np.argmin(misfits)], n_candidates, kappa, rng)
+        study.enqueue_trial(
+            {name: float(value) for name, value in params.items()},
+            user_attrs=dict(source='emulator', emulator_misfit=float(np.exp(mean)), emulator_log_sd=float(sd)),
+        )
+        study.optimize(objective, n_trials=1)
+        trial = study.trials[-1]
+        print(f"Emulator trial {trial.number}: predicted {np.exp(mean):.4f} (log sd {sd:.2f}), "
+              f"simulated {trial.value if trial.value is not None else trial.state.name}")
+    return study
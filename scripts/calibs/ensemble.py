@@ -0,0 +1,118 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+import covasim as cv
+
+# Add the project root to sys.path so Python can find utils
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.snapshot import load_manifest, make_snapshot_sim
+
+ENSEMBLE_KEYS = ('new_infections', 'new_deaths')
+
+class StreamingQuantiles:
+    """
+    Running mean and approximate quantiles of a daily series over many runs, in
+    fixed memory. Each run is binned into a per-day histogram with log1p-spaced
+    edges (fine near zero, relative precision at large counts); quantiles are
+    interpolated within the bin they fall in, except in the lowest bin, which holds
+    the zero days and reports its lower edge.
+    """
+
+    def __init__(self, npts, max_value, n_bins=400):
+        self.edges = np.expm1(np.linspace(0, np.log1p(max_value), n_bins + 1))
+        self.counts = np.zeros((npts, n_bins), dtype=np.int64)
+        self.total = np.zeros(npts)
+        self.n = 0
+
+    def add(self, values):
+        """Add one run's series (length npts)"""
+        values = np.clip(values, 0, self.edges[-1])
+        n_bins = self.counts.shape[1]
+        bins = np.clip(np.searchsorted(self.edges, values, side='right') - 1, 0, n_bins - 1)
+        flat = np.arange(len(values)) * n_bins + bins
+        self.counts.ravel()[flat] += 1  # One entry per day, so no repeated indices
+        self.total += values
+        self.n += 1
+
+    @property
+    def mean(self):
+        return self.total / max(self.n, 1)
+
+    def quantile(self, q):
+        """Per-day q-quantile, q in [0, 1]"""
+        cum = np.cumsum(self.counts, axis=1)
+        target = q * self.n
+        # First bin whose cumulative count reaches the target, then interpolate inside it
+        idx = np.minimum((cum < target).sum(axis=1), self.counts.shape[1] - 1)
+        rows = np.arange(len(idx))
+        below = np.where(idx > 0, cum[rows, np.maximum(idx - 1, 0)], 0)
+        in_bin = np.maximum(self.counts[rows, idx], 1)
+        frac = np.clip((target - below) / in_bin, 0, 1)
+        low, high = self.edges[idx], self.edges[idx + 1]
+        return np.where(idx == 0, low, low + frac * (high - low))  # Days that are all zero stay zero
+
+def run_seed(pars, seed, keys=ENSEMBLE_KEYS, population=None):
+    """
+    Run one sim and return only the requested result arrays, so no Sim crosses the
+    process boundary. With population (a snapshot folder from utils.snapshot), the
+    sim runs on that memory-mapped population instead of building its own.
+    """
+    pars = dict(pars, rand_seed=seed, verbose=0)
+    if population is not None:
+        sim = make_snapshot_sim(population, pars)
+    else:
+        sim = cv.Sim(pars=pars)
+    sim.run(verbose=0)
+    return {key: sim.results[key].values.astype(float) for key in keys}
+
+def run_ensemble(pars, n_runs, n_workers=None, seed=0, keys=ENSEMBLE_KEYS, n_bins=400, population=None):
+    """
+    Run n_runs seeds of a sim in a process pool, streaming each run into quantile
+    and mean accumulators as it finishes. At most two runs per worker are in
+    flight, so memory stays flat however large the ensemble is.
+
+    With population (a snapshot folder), every seed runs on that one population,
+    which all workers map from the page cache instead of each building a copy;
+    seeds then vary only the epidemic, not the population.
+
+    Returns:
+        dict: per key, a dict with 'mean', 'median', 'p25', 'p75', 'p2.5', 'p97.5' arrays, plus 'n_runs'
+    """
+    n_workers = n_workers or os.cpu_count()
+    npts = cv.Sim(pars=dict(pars, verbose=0)).npts
+    pop_size = load_manifest(population)['pop_size'] if population is not None else pars.get('pop_size', 20e3)
+    max_value = pop_size * pars.get('pop_scale', 1)  # A daily count can't exceed the population
+    stats = {key: StreamingQuantiles(npts, max_value, n_bins=n_bins) for key in keys}
+
+    seeds = iter(range(seed, seed + n_runs))
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        pending = set()
+        done_count = 0
+        while True:
+            for s in seeds:
+                pending.add(executor.submit(run_seed, pars, s, keys, population))
+                if len(pending) >= 2 * n_workers:
+                    break
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for key, values in future.result().items():
+                    stats[key].add(values)
+                done_count += 1
+            print(f"\rEnsemble: {done_count}/{n_runs} runs", end='', flush=True)
+    print()
+
+    bands = {'n_runs': n_runs}
+    for key, acc in stats.items():
+        bands[key] = {
+            'mean':   acc.mean,
+            'median': acc.quantile(0.5),
+            'p25':    acc.quantile(0.25),
+            'p75':    acc.quantile(0.75),
+            'p2.5':   acc.quantile(0.025),
+            'p97.5':  acc.quantile(0.975),
+        }
+    return bands
@@ -1,70 +1,101 @@
 import pandas as pd
 import numpy as np
 import covasim as cv
+import os
+import sys
+from functools import lru_cache
 
-# Load the CSV
-df = pd.read_csv("data/baguio_raw.csv", parse_dates=['date'])
+# Add the project root to sys.path so Python can find utils
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.observations import load_observations
 
-# Set 'date' as index and ensure continuous daily date range
-df = df.set_index('date').sort_index()
-full_index = pd.date_range(start=df.index.min(), end=df.index.max())
-df = df.reindex(full_index, fill_value=0)
-df.index.name = 'date'
+# Observations (continuous daily series with the 7-day centered rolling average) come
+# from the cached bundle, loaded on first use, so importing this module needs no data
 
-# Extract series
-cases = df['cases'].values
-deaths = df['deaths'].values
+class MisfitWindow:
+    """
+    Smoothed observations for one date window, aligned and masked once so that
+    repeated scoring is a few vectorized array operations.
 
-# Apply 7-day centered rolling average smoothing
-def smooth(data, window=7):
-    return pd.Series(data).rolling(window=window, center=True).mean().to_numpy()
+    Days outside the observed series or with NaN smoothing are excluded, and the
+    normalizers are the observed maxima within the window.
+    """
 
-smoothed_cases = smooth(cases)
-smoothed_deaths = smooth(deaths)
+    def __init__(self, start_date=None, end_date=None):
+        obs = load_observations()
+        full_index = obs.dates
+        self.start = full_index[0] if start_date is None else pd.Timestamp(start_date)
+        self.end = full_index[-1] if end_date is None else pd.Timestamp(end_date)
+        self.n_days = (self.end - self.start).days + 1
 
-def get_covasim_results(sim):
-    """Extract cases and deaths from Covasim simulation results"""
-    dates = sim.results['date']
-    cases = sim.results['new_infections'].values  # Convert to numpy array
-    deaths = sim.results['new_deaths'].values     # Convert to numpy array
-    
-    # Create a DataFrame with the same date range as our observations
-    sim_df = pd.DataFrame({'cases': cases, 'deaths': deaths}, index=dates)
-    sim_df = sim_df.reindex(full_index, fill_value=0)
-    
-    return sim_df['cases'].values, sim_df['deaths'].values
+        # Position of each window day in the observed series
+        obs_pos = (self.start - full_index[0]).days + np.arange(self.n_days)
+        in_obs = (obs_pos >= 0) & (obs_pos < len(full_index))
+        obs_cases = np.full(self.n_days, np.nan)
+        obs_deaths = np.full(self.n_days, np.nan)
+        obs_cases[in_obs] = obs.smoothed_cases[obs_pos[in_obs]]
+        obs_deaths[in_obs] = obs.smoothed_deaths[obs_pos[in_obs]]
 
-def compute_misfit(obs_cases, model_cases, obs_deaths, model_deaths):
-    M_diag = np.max(obs_cases) if np.max(obs_cases) != 0 else 1
-    M_death = np.max(obs_deaths) if np.max(obs_deaths) != 0 else 1
+        self.valid = ~np.isnan(obs_cases) & ~np.isnan(obs_deaths)
+        self.valid_days = np.flatnonzero(self.valid)
+        self.obs_cases = obs_cases[self.valid]
+        self.obs_deaths = obs_deaths[self.valid]
+        self.M_diag = np.max(self.obs_cases) if len(self.obs_cases) and np.max(self.obs_cases) != 0 else 1
+        self.M_death = np.max(self.obs_deaths) if len(self.obs_deaths) and np.max(self.obs_deaths) != 0 else 1
 
-    print(f"Normalizers: M_diag = {M_diag:.2f}, M_death = {M_death:.2f}")
-    print(f"Observed cases max: {np.max(obs_cases):.2f}, Simulated cases max: {np.max(model_cases):.2f}")
-    print(f"Observed deaths max: {np.max(obs_deaths):.2f}, Simulated deaths max: {np.max(model_deaths):.2f}")
-    
-    J = np.sum(np.abs(obs_cases - model_cases) / M_diag +
-               np.abs(obs_deaths - model_deaths) / M_death)
-    return J
+    def align(self, values, start_date):
+        """
+        Map daily values (n_days or n_sims x n_days) starting at start_date onto the
+        valid window days, zero-filled. Also returns which valid days the values cover.
+        """
+        values = np.atleast_2d(values)
+        offset = (pd.Timestamp(start_date) - self.start).days
+        pos = self.valid_days - offset
+        covered = (pos >= 0) & (pos < values.shape[1])
+        aligned = np.zeros((values.shape[0], len(pos)))
+        aligned[:, covered] = values[:, pos[covered]]
+        return aligned, covered
 
-def calculate_simulation_misfit(sim):
+    def score_arrays(self, cases, deaths, start_date, partial=False):
+        """
+        Misfit of one trajectory (returns a float) or a stack of trajectories (returns
+        an array). With partial=True only the window days the arrays cover are scored.
+        """
+        model_cases, covered = self.align(cases, start_date)
+        model_deaths, _ = self.align(deaths, start_date)
+        err = (np.abs(model_cases - self.obs_cases) / self.M_diag +
+               np.abs(model_deaths - self.obs_deaths) / self.M_death)
+        if partial:
+            err = err[:, covered]
+        J = err.sum(axis=1)
+        return J[0] if np.ndim(cases) == 1 else J
+
+    def score(self, sim):
+        """Misfit of a finished Covasim simulation against this window"""
+        return self.score_arrays(sim.results['new_infections'].values,
+                                 sim.results['new_deaths'].values,
+                                 sim['start_day'])
+
+    def score_partial(self, sim):
+        """Misfit of the days a running simulation has completed, scaled as finalize() would"""
+        if sim.complete:
+            return self.score(sim)
+        t = sim.t
+        scale = sim.rescale_vec[:t]
+        return self.score_arrays(sim.results['new_infections'].values[:t] * scale,
+                                 sim.results['new_deaths'].values[:t] * scale,
+                                 sim['start_day'], partial=True)
+
+@lru_cache(maxsize=None)
+def get_misfit_window(start_date=None, end_date=None):
+    """Shared MisfitWindow per (start_date, end_date); None means the whole observed series"""
+    return MisfitWindow(start_date, end_date)
+
+def calculate_simulation_misfit(sim, window=None):
     """Calculate misfit between Covasim simulation and smoothed observations"""
-    # Get simulation results
-    sim_cases, sim_deaths = get_covasim_results(sim)
-    
-    # Ensure no NaNs in smoothed version
-    valid_idx = ~np.isnan(smoothed_cases) & ~np.isnan(smoothed_deaths)
-    
-    # Use only valid indices for comparison
-    smooth_cases_valid = smoothed_cases[valid_idx]
-    smooth_deaths_valid = smoothed_deaths[valid_idx]
-    sim_cases_valid = sim_cases[valid_idx]
-    sim_deaths_valid = sim_deaths[valid_idx]
-    
-    # Calculate misfit
-    J = compute_misfit(smooth_cases_valid, sim_cases_valid,
-                      smooth_deaths_valid, sim_deaths_valid)
-    
-    return J
+    if window is None:
+        window = get_misfit_window()
+    return window.score(sim)
 
 # Example usage:
 # sim = cv.Sim(...)  # Your Covasim simulation
@@ -1,3 +1,4 @@
+import argparse
 import covasim as cv
 import sciris as sc
 import os
@@ -5,24 +6,19 @@ import matplotlib.pyplot as plt
 import pandas as pd
 from datetime import datetime
 import numpy as np
+import sys
+
+# Add the project root to sys.path so Python can find utils
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.schedule import calibration_periods
+from utils.observations import load_observations
+from ensemble import run_ensemble
 
 # Output folder for plots
 OUTPUT_DIR = 'period_calibration_independent'
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-INTERVENTION_PERIODS = {
-    'merged_1': ('2020-03-02', '2021-03-02'),
-
-    'ecq': ('2020-03-02', '2020-05-15'),
-    'gcq': ('2020-05-16', '2020-05-31'),
-    'mgcq': ('2020-06-01', '2021-01-31'),
-    'gcq2': ('2021-02-01', '2021-10-31'),
-    'al3': ('2021-11-01', '2021-12-05'),
-    'al2_1': ('2021-12-06', '2022-01-09'),
-    'al3_2': ('2022-01-10', '2022-02-16'),
-    'al2_2': ('2022-02-17', '2022-03-01'),
-    'al1': ('2022-03-02', '2022-03-15'),
-}
+INTERVENTION_PERIODS = calibration_periods()  # Schedule periods plus the merged_1 and shortened al1 windows
 
 base_pars = dict(
     pop_size=10e3,
@@ -33,21 +29,18 @@ base_pars = dict(
     rescale=True,
 )
 
-def plot_period(period_name):
-    """Run simulation and plot results for a specific period using calibrated parameters"""
-    if period_name not in INTERVENTION_PERIODS:
-        print(f"Error: Period '{period_name}' not found. Available periods: {list(INTERVENTION_PERIODS.keys())}")
-        return
+def plot_band(ax, dates, bands, color='b'):
+    """Ensemble median with shaded 50% and 95% bands"""
+    ax.fill_between(dates, bands['p2.5'], bands['p97.5'], color=color, alpha=0.15, label='Simulated 95%')
+    ax.fill_between(dates, bands['p25'], bands['p75'], color=color, alpha=0.3, label='Simulated 50%')
+    ax.plot(dates, bands['median'], color=color, label='Simulated (median)')
 
-    # Get period dates
-    start_date, end_date = INTERVENTION_PERIODS[period_name]
-    print(f"\nPlotting period: {period_name.upper()} ({start_date} to {end_date})")
-
-    # Find the most recent calibration results
+def load_best_params(period_name):
+    """Most recent calibrated parameters for a period, or None if it has not been calibrated"""
     param_files = [f for f in os.listdir(OUTPUT_DIR) if f.startswith(f'best_params_{period_name}_')]
     if not param_files:
         print(f"No calibration results found for period {period_name}")
-        return
+        return None
     
     # Get the most recent file
     latest_file = sorted(param_files)[-1]
@@ -56,8 +49,11 @@ def plot_period(period_name):
     print(f"Using parameters from: {latest_file}")
     print(f"Parameters: beta={params['beta']:.6f}, rel_death_prob={params['rel_death_prob']:.6f}")
     print(f"Misfit: {params['misfit']:.4f}")
+    return params
 
-    # Set up and run simulation
+def make_period_pars(period_name, params):
+    """Sim parameters for a period's window with its calibrated beta and rel_death_prob"""
+    start_date, end_date = INTERVENTION_PERIODS[period_name]
     period_pars = base_pars.copy()
     period_pars.update({
         'start_day': start_date,
@@ -65,33 +61,49 @@ def plot_period(period_name):
         'beta': params['beta'],
         'rel_death_prob': params['rel_death_prob']
     })
-    
-    sim = cv.Sim(pars=period_pars)
-    sim.run(verbose=0)
+    return period_pars
 
-    # Load raw and smoothed data
-    raw_df = pd.read_csv("data/baguio_raw.csv", parse_dates=['date'])
-    smoothed_df = pd.read_csv("data/baguio_smoothed.csv", parse_dates=['date'])
-    
-    # Set date as index for both dataframes
-    raw_df = raw_df.set_index('date').sort_index()
-    smoothed_df = smoothed_df.set_index('date').sort_index()
-    
-    # Get the common date range
-    start_date = pd.to_datetime(start_date)
-    end_date = pd.to_datetime(end_date)
+def plot_period(period_name, n_runs=None, n_workers=None):
+    """
+    Run simulation and plot results for a specific period using calibrated parameters.
+    With n_runs, plot the median and 50/95% bands of an ensemble of seeds instead of a single run.
+    """
+    if period_name not in INTERVENTION_PERIODS:
+        print(f"Error: Period '{period_name}' not found. Available periods: {list(INTERVENTION_PERIODS.keys())}")
+        return
+
+    # Get period dates
+    start_date, end_date = INTERVENTION_PERIODS[period_name]
+    print(f"\nPlotting period: {period_name.upper()} ({start_date} to {end_date})")
+
+    # Find the most recent calibration results
+    params = load_best_params(period_name)
+    if params is None:
+        return
+
+    # Set up and run simulation
+    period_pars = make_period_pars(period_name, params)
     
-    # Filter data for this period using the same date range
-    period_raw = raw_df.loc[start_date:end_date]
-    period_smoothed = smoothed_df.loc[start_date:end_date]
+    if n_runs:
+        bands = run_ensemble(period_pars, n_runs, n_workers=n_workers)
+        dates = pd.date_range(start_date, end_date)
+    else:
+        sim = cv.Sim(pars=period_pars)
+        sim.run(verbose=0)
+
+    # Raw and smoothed observations for this period, from the cached bundle
+    observed = load_observations().period(start_date, end_date)
 
     # Create plots
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
     
     # Plot cases
-    ax1.plot(sim.results['date'], sim.results['new_infections'], 'b-', label='Simulated')
-    ax1.plot(period_smoothed.index, period_smoothed['cases'], 'r-', label='Observed (Smoothed)')
-    ax1.scatter(period_raw.index, period_raw['cases'], color='red', alpha=0.2, label='Observed (Raw)')
+    if n_runs:
+        plot_band(ax1, dates, bands['new_infections'])
+    else:
+        ax1.plot(sim.results['date'], sim.results['new_infections'], 'b-', label='Simulated')
+    ax1.plot(observed['dates'], observed['smoothed_cases'], 'r-', label='Observed (Smoothed)')
+    ax1.scatter(observed['dates'], observed['cases'], color='red', alpha=0.2, label='Observed (Raw)')
     ax1.set_title(f'Daily New Cases - {period_name.upper()}')
     ax1.set_xlabel('Date')
     ax1.set_ylabel('Cases')
@@ -99,9 +111,12 @@ def plot_period(period_name):
     ax1.grid(True)
     
     # Plot deaths
-    ax2.plot(sim.results['date'], sim.results['new_deaths'], 'b-', label='Simulated')
-    ax2.plot(period_smoothed.index, period_smoothed['deaths'], 'r-', label='Observed (Smoothed)')
-    ax2.scatter(period_raw.index, period_raw['deaths'], color='red', alpha=0.2, label='Observed (Raw)')
+    if n_runs:
+        plot_band(ax2, dates, bands['new_deaths'])
+    else:
+        ax2.plot(sim.results['date'], sim.results['new_deaths'], 'b-', label='Simulated')
+    ax2.plot(observed['dates'], observed['smoothed_deaths'], 'r-', label='Observed (Smoothed)')
+    ax2.scatter(observed['dates'], observed['deaths'], color='red', alpha=0.2, label='Observed (Raw)')
     ax2.set_title(f'Daily New Deaths - {period_name.upper()}')
     ax2.set_xlabel('Date')
     ax2.set_ylabel('Deaths')
@@ -119,6 +134,9 @@ def plot_period(period_name):
     plt.show()
 
 if __name__ == '__main__':
-    # Specify the period to plot
-    period = 'merged_1'  # Change this to any period from INTERVENTION_PERIODS
-    plot_period(period) 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Plot a calibrated period against the Baguio data')
+    parser.add_argument('period', nargs='?', default='merged_1', help='Any period from INTERVENTION_PERIODS')
+    parser.add_argument('--ensemble', type=int, metavar='N', help='Plot median and 50/95%% bands over N seeds')
+    parser.add_argument('--workers', type=int, help='Worker processes for the ensemble (default: all cores)')
+    args = parser.parse_args()
+    plot_period(args.period, n_runs=args.ensemble, n_workers=args.workers)
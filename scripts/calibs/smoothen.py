@@ -1,12 +1,18 @@
 import pandas as pd
+import os
+import sys
 
-file_path = 'data/baguio_raw.csv'
-df_raw = pd.read_csv(file_path, parse_dates=['date'])
+# Add the project root to sys.path so Python can find utils
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.observations import load_observations
 
-# Apply 7-day moving average smoothing to 'cases' and 'deaths' using rolling window
-df_smoothed = df_raw.copy()
-df_smoothed['cases'] = df_smoothed['cases'].rolling(window=7, center=True).mean()
-df_smoothed['deaths'] = df_smoothed['deaths'].rolling(window=7, center=True).mean()
+# 7-day moving average of 'cases' and 'deaths', as computed once in the observation bundle
+obs = load_observations()
+df_smoothed = pd.DataFrame({
+    'date': obs.dates,
+    'cases': obs.smoothed_cases,
+    'deaths': obs.smoothed_deaths,
+})
 
 # Drop rows with NaN (caused by rolling window at the edges)
 df_smoothed.dropna(inplace=True)
@@ -0,0 +1,179 @@
+'''
+One entry point for the Baguio pipeline. Run from the project root (the data
+paths are relative to it):
+
+    python scripts/cli.py calibrate merged_1 ecq --trials 50
+    python scripts/cli.py plot all --no-show
+    python scripts/cli.py ensemble gcq --runs 200
+    python scripts/cli.py batch jobs.txt
+
+Covasim, pandas, matplotlib and optuna are only imported by the subcommand that
+needs them, so --help and argument errors return immediately. `batch` reads one
+subcommand per line (blank lines and # comments are skipped) and runs them all in
+this process, so the imports are paid once.
+'''
+
+import argparse
+import os
+import shlex
+import sys
+import time
+import traceback
+
+# Add the project root, scripts and calibs folders to sys.path so the pipeline modules can be imported
+SCRIPTS_DIR = os.path.abspath(os.path.dirname(__file__))
+ROOT_DIR = os.path.dirname(SCRIPTS_DIR)
+sys.path.extend([ROOT_DIR, SCRIPTS_DIR, os.path.join(SCRIPTS_DIR, 'calibs')])
+
+def resolve_periods(names, periods):
+    """Expand 'all' and reject unknown period names"""
+    if 'all' in names:
+        return list(periods.keys())
+    unknown = [name for name in names if name not in periods]
+    if unknown:
+        raise SystemExit(f"Unknown period(s) {unknown}. Available periods: {list(periods.keys())}")
+    return names
+
+def cmd_populate(args):
+    if args.location == 'baguio':
+        from populate_baguio import make_baguio_population
+        sim = make_baguio_population(compact=args.compact, prem=args.prem)
+    elif args.scaled:
+        from populate_philippines import populate_ph_scaled
+        sim = populate_ph_scaled(args.agents)
+    else:
+        from populate_philippines import populate_ph
+        sim = populate_ph(args.agents)
+    if args.summary:
+        from utils.summary import PopulationSummary
+        print(f"📝 Population summary saved to {PopulationSummary.from_sim(sim).save(args.summary)}")
+    if args.snapshot:
+        from utils.snapshot import save_snapshot
+        print(f"💾 Population snapshot saved to {save_snapshot(sim, args.snapshot)}")
+
+def cmd_calibrate(args):
+    from calibrate_baguio import INTERVENTION_PERIODS, calibrate_period, calibrate_chain
+    opts = dict(n_workers=args.workers, seed=args.seed, pruner=args.pruner, n_seeds=args.seeds,
+                statistic=args.seed_stat, seed_workers=args.seed_workers, emulator=args.emulator)
+    if args.chain:
+        calibrate_chain(n_trials=args.trials, **opts)
+        return
+    for period in resolve_periods(args.periods, INTERVENTION_PERIODS):
+        calibrate_period(period, n_trials=args.trials, **opts)
+
+def cmd_plot(args):
+    from plot_calibrated_baguio import INTERVENTION_PERIODS, plot_period
+    for period in resolve_periods(args.periods, INTERVENTION_PERIODS):
+        plot_period(period, n_runs=args.ensemble, n_workers=args.workers)
+
+def cmd_seir(args):
+    from seir_counts import run_seir
+    run_seir(profile=args.profile)
+
+def cmd_ensemble(args):
+    import numpy as np
+    from datetime import datetime
+    from plot_calibrated_baguio import INTERVENTION_PERIODS, OUTPUT_DIR, load_best_params, make_period_pars
+    from ensemble import run_ensemble
+    for period in resolve_periods(args.periods, INTERVENTION_PERIODS):
+        params = load_best_params(period)
+        if params is None:
+            continue
+        bands = run_ensemble(make_period_pars(period, params), args.runs, n_workers=args.workers, seed=args.seed,
+                             population=args.population)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filepath = os.path.join(OUTPUT_DIR, f'ensemble_{period}_{timestamp}.npz')
+        np.savez(filepath, **{f'{key}_{stat}': values for key, stats in bands.items() if key != 'n_runs'
+                              for stat, values in stats.items()})
+        print(f"Saved {args.runs}-run ensemble bands for {period} to {filepath}")
+
+def cmd_batch(args):
+    if args.jobs == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(args.jobs) as f:
+            lines = f.read().splitlines()
+    jobs = [line.strip() for line in lines if line.strip() and not line.strip().startswith('#')]
+    failed = []
+    for i, job in enumerate(jobs, 1):
+        print(f"\n▶️  [{i}/{len(jobs)}] {job}")
+        start = time.perf_counter()
+        try:
+            job_args = make_parser().parse_args(shlex.split(job))
+            if job_args.func is cmd_batch:
+                raise SystemExit('batch files cannot run other batches')
+            job_args.func(job_args)
+            error = None
+        except SystemExit as e:  # argparse errors, --help and resolve_periods
+            error = None if e.code in (0, None) else e
+        except Exception as e:
+            traceback.print_exc()
+            error = e
+        if error is None:
+            print(f"✅ Done in {time.perf_counter() - start:.1f} s")
+            continue
+        print(f"❌ Job failed: {job} ({error})")
+        failed.append(job)
+        if args.stop_on_error:
+            break
+    print(f"\n{len(jobs) - len(failed)} of {len(jobs)} jobs succeeded")
+    if failed:
+        raise SystemExit(1)
+
+def make_parser():
+    parser = argparse.ArgumentParser(description='Baguio COVID-19 simulation pipeline')
+    parser.add_argument('--no-show', action='store_true', help='Save figures without opening windows (implied by batch)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('populate', help='Build and summarize a population')
+    p.add_argument('location', nargs='?', default='baguio', choices=['baguio', 'philippines'])
+    p.add_argument('--agents', type=int, default=100_000, help='Agents for the Philippines population')
+    p.add_argument('--scaled', action='store_true', help='Scale the Philippines population to the household total')
+    p.add_argument('--compact', action='store_true', help='32-bit arrays and deduplicated layers, with a memory report (Baguio)')
+    p.add_argument('--prem', action='store_true', help='Build the s/w/c layers from the Prem et al. contact matrices (Baguio)')
+    p.add_argument('--summary', metavar='FILE', help='Save the population summary as JSON (for diffing populations)')
+    p.add_argument('--snapshot', metavar='DIR', help='Save the population as a memory-mappable snapshot folder')
+    p.set_defaults(func=cmd_populate)
+
+    p = sub.add_parser('calibrate', help='Calibrate one or more intervention periods')
+    p.add_argument('periods', nargs='*', default=['merged_1'], help="Period names, or 'all'")
+    p.add_argument('--trials', type=int, default=100, help='Optuna trials per period')
+    p.add_argument('--workers', type=int, default=1, help='Worker processes sharing each study')
+    p.add_argument('--seed', type=int, default=0, help='Base seed; worker i uses seed + i')
+    p.add_argument('--pruner', default='median', choices=['median', 'halving', 'none'])
+    p.add_argument('--chain', action='store_true', help='Calibrate the schedule periods in order on one timeline')
+    p.add_argument('--seeds', type=int, default=1, help='Score each trial on this many fixed seeds')
+    p.add_argument('--seed-stat', default='mean', choices=['mean', 'median'])
+    p.add_argument('--seed-workers', type=int, default=1, help="Processes running each trial's seeds in parallel")
+    p.add_argument('--emulator', action='store_true', help='Let a Gaussian-process emulator pick trials')
+    p.set_defaults(func=cmd_calibrate)
+
+    p = sub.add_parser('plot', help='Plot calibrated periods against the observations')
+    p.add_argument('periods', nargs='*', default=['merged_1'], help="Period names, or 'all'")
+    p.add_argument('--ensemble', type=int, metavar='N', help='Plot median and 50/95%% bands over N seeds')
+    p.add_argument('--workers', type=int, help='Worker processes for the ensemble (default: all cores)')
+    p.set_defaults(func=cmd_plot)
+
+    p = sub.add_parser('seir', help='Run the SEIR simulation and plot the compartments')
+    p.add_argument('--profile', action='store_true', help='Record a per-step time breakdown')
+    p.set_defaults(func=cmd_seir)
+
+    p = sub.add_parser('ensemble', help='Save median and 50/95%% bands over many seeds of calibrated periods')
+    p.add_argument('periods', nargs='*', default=['merged_1'], help="Period names, or 'all'")
+    p.add_argument('--runs', type=int, default=100, help='Seeds per period')
+    p.add_argument('--workers', type=int, help='Worker processes (default: all cores)')
+    p.add_argument('--seed', type=int, default=0, help='First seed')
+    p.add_argument('--population', metavar='DIR', help='Run every seed on this snapshot (from populate --snapshot)')
+    p.set_defaults(func=cmd_ensemble)
+
+    p = sub.add_parser('batch', help='Run many subcommands, one per line of a file, in this process')
+    p.add_argument('jobs', help="Jobs file, or '-' for stdin")
+    p.add_argument('--stop-on-error', action='store_true', help='Stop at the first failed job')
+    p.set_defaults(func=cmd_batch)
+    return parser
+
+if __name__ == '__main__':
+    args = make_parser().parse_args()
+    if args.no_show or args.command == 'batch':
+        os.environ.setdefault('MPLBACKEND', 'Agg')  # Must be set before matplotlib is first imported
+    args.func(args)
@@ -1,8 +1,16 @@
-import pandas as pd
 import matplotlib.pyplot as plt
+import os
+import sys
 
-df_raw = pd.read_csv('data/baguio_raw.csv', parse_dates=['date'])
-df_smoothed = pd.read_csv('data/baguio_smoothed.csv', parse_dates=['date'])
+# Add the project root to sys.path so Python can find utils
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.observations import load_observations
+
+# Raw and 7-day smoothed series from the cached observation bundle
+df = load_observations().to_frame().reset_index()
+df_raw = df[['date', 'cases', 'deaths']]
+df_smoothed = df[['date', 'smoothed_cases', 'smoothed_deaths']].rename(
+    columns={'smoothed_cases': 'cases', 'smoothed_deaths': 'deaths'})
 
 # Create figure with two subplots
 fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8), sharex=True)
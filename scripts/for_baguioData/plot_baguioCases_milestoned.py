@@ -1,5 +1,11 @@
 import pandas as pd
 import matplotlib.pyplot as plt
+import sys
+import os
+
+# Add the project root to sys.path so Python can find utils
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils.schedule import schedule_milestones
 
 # Load your CSV
 data = pd.read_csv('data/baguio_cases.csv')
@@ -10,17 +16,7 @@ plt.figure(figsize=(18, 6))
 plt.plot(data['dates_discovery'], data['cases'], label='Cases', color='darkslateblue')
 
 # Define milestones: (start, end, label, color)
-milestones = [
-    ('2020-03-02', '2020-05-15', 'ECQ', 'red'),
-    ('2020-05-16', '2020-05-31', 'GCQ', 'darkred'),
-    ('2020-06-01', '2021-01-31', 'MGCQ', 'orange'),
-    ('2021-02-01', '2021-10-31', 'GCQ', 'darkred'),
-    ('2021-11-01', '2021-12-05', 'AL3', 'gold'),
-    ('2021-12-06', '2022-01-09', 'AL2', 'yellowgreen'),
-    ('2022-01-10', '2022-02-16', 'AL3', 'gold'),
-    ('2022-02-17', '2022-03-01', 'AL2', 'yellowgreen'),
-    ('2022-03-02', '2023-07-31', 'AL1', 'lightgreen')
-]
+milestones = schedule_milestones()
 
 # Plot shaded regions and add text labels
 for start, end, label, color in milestones:
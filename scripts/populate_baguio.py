@@ -1,17 +1,24 @@
-import covasim as cv
 import networkx as nx
 import numpy as np
+import sys
+import os
+
+# Add the project root to sys.path so Python can find utils
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.contacts import ContactIndex
+from utils.summary import PopulationSummary
+from utils.ages import bins_from_labels
+from utils.population import make_population_sim
+from utils.compact import compact_population
+from utils.prem_contacts import PREM_DIR, add_prem_layers, prem_distances
 
 def summarize_population(sim):
     people = sim.people
-    contacts = people.contacts  # Dictionary of contacts per layer
+    contact_index = ContactIndex(people)  # CSR adjacency per layer, for O(degree) lookups
 
-    # General population stats
-    print(f"\n📊 Total people generated: {len(people)}")
-    print(f"👶 Age range: {min(people.age):.2f} to {max(people.age):.2f}")
-    print(f"🧑 Avg age: {people.age.mean():.2f}")
-    print(f"👫 Number of males: {(people.sex == 0).sum()}")
-    print(f"👭 Number of females: {(people.sex == 1).sum()}")
+    # General population stats, computed in one vectorized pass
+    summary = PopulationSummary.from_sim(sim)
+    summary.report()
 
     # Sample some individuals and print their contacts
     print(f"\n👥 Sample individuals with contacts: (from total {len(people)})")
@@ -21,12 +28,10 @@ def summarize_population(sim):
         person = people[int(i)]
         print(f"Person {i}:")
         print(f"  Age: {person.age:.2f}")
-        print(f"  Sex: {'M' if person.sex == 0 else 'F'}")
+        print(f"  Sex: {'M' if person.sex == 1 else 'F'}")
         for layer in ['h', 's', 'w', 'c']:  # Household, school, work, and community layers
-            p1 = contacts[layer]['p1']
-            p2 = contacts[layer]['p2']
-            contact_ids = set(p2[p1 == i]) | set(p1[p2 == i])  # Find contact pairs for this person
-            print(f"  Contacts - {layer}: {sorted(contact_ids)}")
+            contact_ids = contact_index.neighbors(i, layer)  # Find contact pairs for this person
+            print(f"  Contacts - {layer}: {contact_ids.tolist()}")
         print()
 
     # Optional: Visualize contact layers as graphs using NetworkX
@@ -36,7 +41,7 @@ def summarize_population(sim):
     #     G_layer.add_edges_from(zip(layer_contacts['p1'], layer_contacts['p2']))
     #     print(f"{layer} layer: {G_layer.number_of_edges()} edges")
 
-def make_baguio_population(total_population_baguio=366358, total_population_ph=109035343):
+def make_baguio_population(total_population_baguio=366358, total_population_ph=109035343, compact=False, prem=False):
     # Age group data for Baguio (scaled for population size)
     age_groups_baguio = {
         '0-4': 107, '5-9': 110, '10-14': 105, '15-19': 100, '20-24': 97,
@@ -61,48 +66,42 @@ def make_baguio_population(total_population_baguio=366358, total_population_ph=1
     scaling_factor_urban_population = total_urban_population_baguio / total_urban_population_ph
     print(f"Scaling factor for urban population: {scaling_factor_urban_population:.4f}")
     
-    # 4. Create the synthetic population for Baguio
-    sim = cv.Sim(
-        pop_size=total_population_baguio,  # Use Baguio's total population size
-        pop_type='hybrid',  # Hybrid population type
-        location='Philippines',  # Set to Philippines for general location
-        label='Baguio City Population Example'
-    )
-    sim.initialize()
-
-    # 5. Create an age distribution based on the age groups
+    # 4. Create an age distribution based on the age groups
     age_group_proportions = {group: count / sum(age_groups_baguio.values()) for group, count in age_groups_baguio.items()}
-    
-    # Create the synthetic population based on the proportions
-    ages = []
-    for group, proportion in age_group_proportions.items():
-        # Determine the age range for this group
-        age_range = group.split('-')
-        if len(age_range) == 1:  # If the group is 80+, use 80 as the lower bound
-            min_age = 80
-            max_age = 100
-        else:
-            min_age = int(age_range[0])
-            max_age = int(age_range[1])
-        
-        # Scale the population for each group and assign ages
-        group_population = int(proportion * total_population_baguio)
-        ages.extend(np.random.randint(min_age, max_age, size=group_population))
 
-    # Assign ages to the synthetic population
-    sim.people.age = np.array(ages)
-
-    # 6. Adjust sex distribution based on the ratio of males to females
+    # 5. Adjust sex distribution based on the ratio of males to females
     male_ratio = 178966 / total_population_baguio
-    num_males = int(male_ratio * total_population_baguio)
-    num_females = total_population_baguio - num_males
-    sim.people.sex = np.concatenate([np.zeros(num_males), np.ones(num_females)])
+
+    # 6. Create the synthetic population for Baguio; people and contact layers are built
+    #    once at initialization from these ages, sexes and the Baguio household count
+    sim = make_population_sim(
+        pars=dict(
+            location='Philippines',  # Set to Philippines for general location
+            # With Prem layers, skip generating the generic s/w/c layers that would be replaced
+            **(dict(contacts=dict(h=4, s=0, w=0, c=0)) if prem else {}),
+        ),
+        age_bins=bins_from_labels(age_group_proportions.keys()),
+        age_weights=list(age_group_proportions.values()),
+        pop_size=total_population_baguio,  # Use Baguio's total population size
+        male_ratio=male_ratio,
+        n_households=total_households_baguio,
+        label='Baguio City Population Example',
+    )
+    sim.initialize()
+    if prem:
+        add_prem_layers(sim)  # Age-assortative s/w/c layers from the Prem et al. PHL matrices
+        print("🏫 Prem contacts per agent: " + ', '.join(f"{lkey}={sim['contacts'][lkey]:.1f}" for lkey in 'swc'))
+    if PREM_DIR.exists():
+        distances = prem_distances(sim.people)  # How far each layer's age mixing is from Prem et al.
+        print("📐 Distance from Prem matrices: " + ', '.join(f"{lkey}={d:.3f}" for lkey, d in distances.items()))
 
     # 7. Applying scaling factors to adjust population characteristics
     sim.pars['pop_size'] = int(total_population_baguio)  # Set the population size for the simulation
     sim.pars['pop_scale'] = scaling_factor_population  # Scale the population according to Baguio
 
     print(f"\n✅ Population size set for Baguio: {len(sim.people)}")
+    if compact:
+        compact_population(sim)  # 32-bit arrays and deduplicated layers; prints memory per layer
     summarize_population(sim)  # Summarize the population data for Baguio
     return sim
 
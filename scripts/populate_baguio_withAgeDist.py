@@ -1,32 +1,22 @@
 import covasim as cv
 import numpy as np
 import matplotlib.pyplot as plt
+import sys
+import os
 
-def get_baguio_age_distribution():
+# Add the project root to sys.path so Python can find utils
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.ages import sample_ages, CENSUS_AGE_BINS, BAGUIO_AGE_COUNTS
+from utils.population import make_population_sim
+
+def get_baguio_age_distribution(seed=None):
     """
     Returns the age distribution array for Baguio city.
     Returns:
         numpy.ndarray: Array of ages following Baguio's age distribution
     """
-    # --- Prepare custom age distribution for Baguio ---
-    age_bins = [(0, 4), (5, 9), (10, 14), (15, 19), (20, 24),
-                (25, 29), (30, 34), (35, 39), (40, 44), (45, 49),
-                (50, 54), (55, 59), (60, 64), (65, 69), (70, 74),
-                (75, 79), (80, 100)]
-
-    age_counts = [26573, 28840, 30713, 34527, 39461,
-                  35642, 30818, 27658, 23055, 19413,
-                  18170, 15460, 12362, 8581, 5461,
-                  2985, 3432]
-
-    # Create age array using actual counts
-    ages = []
-    for (low, high), count in zip(age_bins, age_counts):
-        ages.extend(np.random.randint(low, high + 1, count))
-    ages = np.array(ages)
-    np.random.shuffle(ages)
-    
-    return ages
+    # Whole-year ages using the actual census counts per bin
+    return sample_ages(CENSUS_AGE_BINS, BAGUIO_AGE_COUNTS, rng=seed, integer=True)
 
 if __name__ == "__main__":
     # Get the age distribution
@@ -51,16 +41,15 @@ if __name__ == "__main__":
         # sim2.run()
 
     # --- Simulation 1: Custom age distribution (Baguio) ---
-    sim1 = cv.Sim(
-        n_days=365,
-        pop_size=len(ages),
-        pop_type='hybrid',
-        location=None,      # No default location data, so Covasim doesn't overwrite your population
-        pop_infected=10,
-        pop_scale=1,
+    sim1 = make_population_sim(
+        pars=dict(
+            n_days=365,
+            location=None,      # No default location data, so Covasim doesn't overwrite your population
+            pop_infected=10,
+            pop_scale=1,
+        ),
+        ages=ages,              # People and contact layers are built once from these ages
     )
-    sim1.initialize()  # Initialize first to create the sim object
-    sim1.people = cv.make_people(sim=sim1, age=ages, n=len(ages), pop_scale=1)  # Now inject custom ages
     sim1.run()
 
     # --- Simulation 2: Default Philippines ---
@@ -1,11 +1,16 @@
 import covasim as cv
 import matplotlib.pyplot as plt
 import numpy as np
-# import networkx as nx
 import concurrent.futures
 from tqdm import tqdm 
 from collections import Counter
 import time
+import sys
+import os
+
+# Add the project root to sys.path so Python can find utils
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.summary import PopulationSummary
 
 # PH_POP_household = 108_667_043
 PH_POP_household = 100_000
@@ -14,74 +19,23 @@ PH_POP_household = 100_000
 # -------------------------------------------------- #
 
 def summarize_population(sim, scaled=False):
-    people = sim.people
-
-    # Age distribution
-    ages = people.age
-    print("\n📊 Age Distribution (sample):")
-
-    print(np.round(np.percentile(ages,
-        # Min, Q1, Median, Q3, Max
-        [0, 25, 50, 75, 100]), 1))  
-
-    # # Household size estimation via contact graph
-    # household_contacts = sim.people.contacts['h']
-    # pairs = list(zip(household_contacts['p1'], household_contacts['p2']))
-
-    # # Build groups from pairwise household contacts
-    # G = nx.Graph()
-    # G.add_edges_from(pairs)
-
-    # household_sizes = [len(c) for c in nx.connected_components(G)]
-    # size_counts = Counter(household_sizes)
-
-    # print("\n🏠 Estimated Household Size Distribution:")
-    # for size in sorted(size_counts):
-    #     print(f"{size} members: {size_counts[size]} households")
-
-    # Custom age groups (non-overlapping)
-    age_groups = [
-        ("0–4", 0, 4),
-        ("5–9", 5, 9),
-        ("10–14", 10, 14),
-        ("15–19", 15, 19),
-        ("20–24", 20, 24),
-        ("25–29", 25, 29),
-        ("30–34", 30, 34),
-        ("35–39", 35, 39),
-        ("40–44", 40, 44),
-        ("45–49", 45, 49),
-        ("50–54", 50, 54),
-        ("55–59", 55, 59),
-        ("60–64", 60, 64),
-        ("65–69", 65, 69),
-        ("70–74", 70, 74),
-        ("75–79", 75, 79),
-        ("80+", 80, 120),
-    ]
-
-    group_counts = {}
-    for label, lower, upper in age_groups:
-        count = np.sum((ages >= lower) & (ages <= upper))
-        if scaled:
-            # Scale the count
-            count = count * sim.pars['pop_scale']
-        group_counts[label] = count
-
-    # Print group counts
-    print("\n📊 Age Group Counts:")
-    total = 0
-    for label, count in group_counts.items():
-        total += count
-        percent = (count / total) * 100
-        print(f"{label}: {count:,.0f} people ({percent:.2f}%)")
+    # Age histogram, sex, contact degrees and households in one vectorized pass
+    summary = PopulationSummary.from_sim(sim)
+    summary.report(scaled=scaled)
+
+    # Household size estimation via the contact graph's connected components
+    size_counts = summary.households['size_histogram']
+    print("\n🏠 Estimated Household Size Distribution:")
+    for size in np.flatnonzero(size_counts):
+        print(f"{size} members: {size_counts[size]} households")
 
     # Print total count
-    print(f"\n🔢 Total Population: {total:,.0f} people")
+    counts = summary.scaled_age_counts if scaled else summary.age_counts
+    print(f"\n🔢 Total Population: {counts.sum():,.0f} people")
 
     # Plotting
-    labels = list(group_counts.keys())
-    values = list(group_counts.values())
+    labels = summary.age_labels
+    values = counts
 
     plt.figure(figsize=(12, 6))
     plt.bar(labels, values, color='skyblue', edgecolor='k')
@@ -3,6 +3,12 @@ import matplotlib.pyplot as plt
 import numpy as np
 import scipy.stats as stats
 import time
+import sys
+import os
+
+# Add the project root to sys.path so Python can find utils
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.summary import PopulationSummary
 
 # Philippine population
 PH_POP_household = 300_000
@@ -147,6 +153,15 @@ if __name__ == '__main__':
     # Plot comparison
     plot_comparison(hist1_norm, hist2_norm, bins, sim1, sim2)
 
+    # Census-bin shares and household sizes of the scaled population relative to the unscaled one
+    summary1 = PopulationSummary.from_sim(sim1)
+    summary2 = PopulationSummary.from_sim(sim2)
+    share_diff = summary2.age_shares - summary1.age_shares
+    print("\n📊 Age share difference, scaled - unscaled (percentage points):")
+    for label, diff in zip(summary1.age_labels, share_diff):
+        print(f"{label}: {diff:+.2f}")
+    print(f"🏠 Mean household size difference: {summary1.diff(summary2)['households']['mean_size']:+.3f}")
+
     # Print the Chi-Square Results
     print(f"\n📊 Chi-Square Test Results: ")
     print(f"Chi-Square Statistic: {chi2_stat:.2f}")
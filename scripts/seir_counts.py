@@ -1,39 +1,85 @@
+import argparse
 import covasim as cv
+import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
+import sys
+import os
+
+# Add the project root to sys.path so Python can find utils
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.schedule import load_schedule, schedule_periods, schedule_milestones, beta_schedule, duration_schedule
+from utils.profiling import Profiler
+
+# People state flags, packed into one small integer code per agent (bit i = STATE_FLAGS[i])
+STATE_FLAGS = ['susceptible', 'exposed', 'infectious', 'symptomatic', 'recovered', 'dead']
+
+# Tracked states as functions of the flags; they can overlap (e.g. recovered and susceptible with waning)
+TRACKED_STATES = {
+    'susceptible':     lambda f: f['susceptible'],
+    'exposed':         lambda f: f['exposed'] & ~f['infectious'],
+    'infectious':      lambda f: f['infectious'],
+    'infectious_asym': lambda f: f['infectious'] & ~f['symptomatic'],
+    'infectious_sym':  lambda f: f['infectious'] & f['symptomatic'],
+    'recovered':       lambda f: f['recovered'],
+    'dead':            lambda f: f['dead'],
+}
+
+def make_state_matrix():
+    """(n_codes, n_states) 0/1 matrix: which tracked states each packed code counts towards"""
+    codes = np.arange(2**len(STATE_FLAGS))
+    flags = {key: ((codes >> bit) & 1).astype(bool) for bit, key in enumerate(STATE_FLAGS)}
+    return np.column_stack([rule(flags) for rule in TRACKED_STATES.values()]).astype(np.int64)
 
 class store_seir(cv.Analyzer):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs) # This is necessary to initialize the class properly
-        self.tracked_states = {
-            'susceptible': [],
-            'exposed': [],
-            'infectious': [],
-            'infectious_asym': [],
-            'infectious_sym': [],
-            'recovered': [],
-            'dead': []
-        }
-        self.t = []
-        self.S = []
-        self.E = []
-        self.I = []
-        self.R = []
+        self.states = list(TRACKED_STATES.keys())
+        self.counts = None
+        self.n_steps = 0
+        return
+
+    def initialize(self, sim):
+        super().initialize()
+        # Preallocate one row per time point, plus scratch buffers for the per-agent codes
+        self.counts = np.zeros((sim.npts, len(self.states)), dtype=np.int64)
+        self.n_steps = 0
+        self._matrix = make_state_matrix()
+        self._code = np.zeros(len(sim.people), dtype=np.uint8)
+        self._bits = np.zeros(len(sim.people), dtype=np.uint8)
         return
 
     def apply(self, sim):
         ppl = sim.people # Shorthand
-        self.t.append(sim.t)
-        self.tracked_states['susceptible'].append(ppl.susceptible.sum())
-        self.tracked_states['exposed'].append(ppl.exposed.sum() - ppl.infectious.sum())
-        self.tracked_states['infectious'].append(ppl.infectious.sum())
-        self.tracked_states['infectious_asym'].append((sim.people.infectious & ~sim.people.symptomatic).sum())
-        self.tracked_states['infectious_sym'].append((sim.people.infectious & sim.people.symptomatic).sum())
-        self.tracked_states['recovered'].append(ppl.recovered.sum())
-        self.tracked_states['dead'].append(ppl.dead.sum())
+        code, bits = self._code, self._bits
+        code[:] = 0
+        for bit, key in enumerate(STATE_FLAGS):
+            np.left_shift(getattr(ppl, key).view(np.uint8), bit, out=bits)
+            code |= bits
+        self.counts[sim.t] = np.bincount(code, minlength=len(self._matrix)) @ self._matrix
+        self.n_steps = sim.t + 1
         return
 
+    @property
+    def t(self):
+        return np.arange(self.n_steps)
+
+    @property
+    def cumulative(self):
+        """Counts per day, shape (n_days, n_states)"""
+        return self.counts[:self.n_steps]
+
+    @property
+    def daily(self):
+        """Day-over-day change in each count, zero on the first day"""
+        counts = self.cumulative
+        return np.diff(counts, axis=0, prepend=counts[:1])
+
+    @property
+    def tracked_states(self):
+        return {state: self.cumulative[:, i] for i, state in enumerate(self.states)}
+
     def plot(self):
         # Plot cumulative counts
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 8))
@@ -50,24 +96,13 @@ class store_seir(cv.Analyzer):
         }
         
         # Cumulative counts plot
-        for state in self.tracked_states:
-            ax1.plot(self.t, self.tracked_states[state], 
+        for state, counts in self.tracked_states.items():
+            ax1.plot(self.t, counts, 
                     label=state.replace('_', ' ').title(), 
                     color=color_map[state])
 
         # Define visualization data for quarantine periods
-        quarantine_vis = [
-            # (start_date, end_date, label, color)
-            ('2020-03-02', '2020-05-15', 'ECQ', 'red'),
-            ('2020-05-16', '2020-05-31', 'GCQ', 'darkred'),
-            ('2020-06-01', '2021-01-31', 'MGCQ', 'orange'),
-            ('2021-02-01', '2021-10-31', 'GCQ', 'darkred'),
-            ('2021-11-01', '2021-12-05', 'AL3', 'gold'),
-            ('2021-12-06', '2022-01-09', 'AL2', 'yellowgreen'),
-            ('2022-01-10', '2022-02-16', 'AL3', 'gold'),
-            ('2022-02-17', '2022-03-01', 'AL2', 'yellowgreen'),
-            ('2022-03-02', '2023-07-31', 'AL1', 'lightgreen')
-        ]
+        quarantine_vis = schedule_milestones()  # (start_date, end_date, label, color)
 
         # Add vertical lines and annotations for each quarantine period
         for i, (start_date, end_date, label, color) in enumerate(quarantine_vis):
@@ -98,11 +133,9 @@ class store_seir(cv.Analyzer):
         ax1.get_yaxis().set_major_formatter(plt.FuncFormatter(lambda x, _: f'{int(x):,}'))
 
         # Daily counts plot
-        for state in self.tracked_states:
-            daily_counts = [0] + [self.tracked_states[state][i] - self.tracked_states[state][i-1] 
-                                for i in range(1, len(self.tracked_states[state]))]
-            
-            ax2.plot(self.t, daily_counts, 
+        daily = self.daily
+        for i, state in enumerate(self.states):
+            ax2.plot(self.t, daily[:, i], 
                     label=f'Daily {state.replace("_", " ").title()}', 
                     color=color_map[state], 
                     alpha=0.7)
@@ -120,148 +153,82 @@ class store_seir(cv.Analyzer):
 
 BAGUIO_population_hh = 366358
 
-# Define specific interventions with detailed properties
-ecq_start = '2020-03-02'
-ecq_end = '2020-05-15'
-gcq_start = '2020-05-16'
-gcq_end = '2020-05-31'
-mgcq_start = '2020-06-01'
-mgcq_end = '2021-01-31'
-gcq2_start = '2021-02-01'
-gcq2_end = '2021-10-31'
-al3_start = '2021-11-01'
-al3_end = '2021-12-05'
-al2_start = '2021-12-06'
-al2_end = '2022-01-09'
-al3_2_start = '2022-01-10'
-al3_2_end = '2022-02-16'
-al2_2_start = '2022-02-17'
-al2_2_end = '2022-03-01'
-al1_start = '2022-03-02'
-al1_end = '2023-07-31'
-
-# Create ECQ intervention
-ecq_intervention = cv.change_beta(
-    days=[ecq_start, ecq_end],
-    changes=[0.3, 1.0],  # Reduce transmission to 30% during ECQ, return to normal after
-    layers=['h', 's', 'w', 'c']  # Apply to all layers
-)
-
-# Create GCQ intervention
-gcq_intervention = cv.change_beta(
-    days=[gcq_start, gcq_end],
-    changes=[0.4, 1.0],  # Reduce transmission to 40% during GCQ, return to normal after
-    layers=['h', 's', 'w', 'c']  # Apply to all layers
-)
-
-# Create MGCQ intervention
-mgcq_intervention = cv.change_beta(
-    days=[mgcq_start, mgcq_end],
-    changes=[0.5, 1.0],  # Reduce transmission to 50% during MGCQ
-    layers=['h', 's', 'w', 'c']
-)
-
-# Create second GCQ intervention with all parameters
-class GCQ2Intervention(cv.Intervention):
-    def __init__(self, start_day, end_day):
-        super().__init__()
-        self.start_day = start_day
-        self.end_day = end_day
-
-    def apply(self, sim):
-        if sim.t == self.start_day:
-            # Modify disease duration parameters for GCQ2 period
-            sim['dur']['inf2rec'] = {'dist': 'normal', 'par1': 100.0, 'par2': 2.0}  # Increase infectious to recovery duration
-            sim['dur']['asym2rec'] = {'dist': 'normal', 'par1': 100.0, 'par2': 2.0}  # Increase asymptomatic to recovery duration
-            
-        elif sim.t == self.end_day:
-            # Restore original values
-            sim['dur']['inf2rec'] = {'dist': 'normal', 'par1': 10.0, 'par2': 2.0}  # Original infectious to recovery duration
-            sim['dur']['asym2rec'] = {'dist': 'normal', 'par1': 8.0, 'par2': 2.0}   # Original asymptomatic to recovery duration
-
-# Create the GCQ2 interventions
-gcq2_beta = cv.change_beta(
-    days=[gcq2_start, gcq2_end],
-    changes=[0.4, 1.0],  # Reduce transmission to 40% during GCQ2
-    layers=['h', 's', 'w', 'c']
-)
-
-gcq2_disease = GCQ2Intervention(
-    start_day=(pd.to_datetime(gcq2_start) - pd.to_datetime('2020-03-02')).days,
-    end_day=(pd.to_datetime(gcq2_end) - pd.to_datetime('2020-03-02')).days
-)
-
-# Create AL3 intervention
-al3_intervention = cv.change_beta(
-    days=[al3_start, al3_end],
-    changes=[0.6, 1.0],  # Alert Level 3 transmission reduction
-    layers=['h', 's', 'w', 'c']
-)
-
-# Create AL2 intervention
-al2_intervention = cv.change_beta(
-    days=[al2_start, al2_end],
-    changes=[0.7, 1.0],  # Alert Level 2 transmission reduction
-    layers=['h', 's', 'w', 'c']
-)
-
-# Create second AL3 intervention
-al3_2_intervention = cv.change_beta(
-    days=[al3_2_start, al3_2_end],
-    changes=[0.6, 1.0],  # Back to AL3 levels
-    layers=['h', 's', 'w', 'c']
-)
-
-# Create second AL2 intervention
-al2_2_intervention = cv.change_beta(
-    days=[al2_2_start, al2_2_end],
-    changes=[0.7, 1.0],  # Back to AL2 levels
-    layers=['h', 's', 'w', 'c']
-)
-
-# Create AL1 intervention
-al1_intervention = cv.change_beta(
-    days=[al1_start, al1_end],
-    changes=[0.8, 1.0],  # Most relaxed restrictions
-    layers=['h', 's', 'w', 'c']
+def make_interventions():
+    """Fresh intervention objects for one sim: the quarantine timeline and the GCQ2 durations"""
+    # Quarantine timeline (ECQ through AL1), loaded from data/quarantine_schedule.csv
+    schedule = load_schedule()
+    gcq2_start, gcq2_end = schedule_periods(schedule)['gcq2']
+
+    # All beta changes are applied by a single compiled intervention
+    quarantine_beta = beta_schedule(schedule)
+
+    # Longer recovery durations during GCQ2; the sim's original durations are restored afterwards
+    gcq2_disease = duration_schedule([
+        dict(start_day=gcq2_start, end_day=gcq2_end, dur={
+            'mild2rec': {'dist': 'normal', 'par1': 100.0, 'par2': 2.0},  # Increase mild (symptomatic) to recovery duration
+            'asym2rec': {'dist': 'normal', 'par1': 100.0, 'par2': 2.0},  # Increase asymptomatic to recovery duration
+        }),
+    ])
+    return [quarantine_beta, gcq2_disease]
+
+seir_pars = dict(
+    # Setters
+    pop_size = 50000,  # Simulate with 50,000 people
+    pop_type = 'hybrid',  # Need to specify this for contact layers
+    location = 'Philippines',
+    # pop_infected = 1,  # Start with 1 infected person
+    start_day = '2020-03-02',
+    end_day = '2023-07-31',
+
+    # Contact parameters
+    contacts = {'h': 3.0, 's': 20, 'w': 20, 'c': 20},  # Average contacts per layer
+    beta_layer = {'h': 3.0, 's': 1.0, 'w': 0.6, 'c': 0.3},  # Base transmission rates per layer
+
+    # Baguio-calibrated Parameters
+    beta = 0.016,  # Increased from 0.01042 to allow for some spread
+    rel_death_prob = 0.05180,
 )
 
-sim = cv.Sim(
-        # Setters
-        pop_size = 50000,  # Simulate with 50,000 people
-        pop_type = 'hybrid',  # Need to specify this for contact layers
-        location = 'Philippines',
-        # pop_infected = 1,  # Start with 1 infected person
-        start_day = '2020-03-02',
-        end_day = '2023-07-31',
-
-        # Contact parameters
-        contacts = {'h': 3.0, 's': 20, 'w': 20, 'c': 20},  # Average contacts per layer
-        beta_layer = {'h': 3.0, 's': 1.0, 'w': 0.6, 'c': 0.3},  # Base transmission rates per layer
-
-        # Baguio-calibrated Parameters
-        beta = 0.016,  # Increased from 0.01042 to allow for some spread
-        rel_death_prob = 0.05180,
-
-        interventions=[ecq_intervention, gcq_intervention, mgcq_intervention, 
-                      gcq2_beta, gcq2_disease, al3_intervention, al2_intervention,
-                      al3_2_intervention, al2_2_intervention, al1_intervention],  # Add all interventions
-        analyzers=store_seir(label='seir'))
-sim.run()
-seir = sim.get_analyzer('seir') # Retrieve by label
-
-# Explicitly print SEIR counts per day
-print("Day\tSUS\tEXP\tINF (asymp+symp)\t\tRCV\tDTH\tTotal")
-for t, S, E, I, I_asymp, I_symp, R, D in zip(seir.t, 
-                            seir.tracked_states['susceptible'], 
-                            seir.tracked_states['exposed'], 
-                            seir.tracked_states['infectious'], 
-                            seir.tracked_states['infectious_asym'], 
-                            seir.tracked_states['infectious_sym'], 
-                            seir.tracked_states['recovered'], 
-                            seir.tracked_states['dead']):
-    total = S + E + I + D
-    print(f"{t}\t{S:,}\t{E:,}\t{I:,} ({I_asymp}+{I_symp}) \t{R:,}\t{D:,}\t{total:,}")
-
-
-seir.plot()
+def make_sim(profile=False, **kwargs):
+    """The Baguio SEIR sim with all interventions and the SEIR analyzer; kwargs override seir_pars"""
+    pars = dict(seir_pars, **kwargs)
+    analyzers = [store_seir(label='seir')]
+    if profile:
+        analyzers.append(Profiler(label='profiler'))
+    return cv.Sim(pars=pars, interventions=make_interventions(), analyzers=analyzers)
+
+def run_seir(profile=False):
+    """Run the SEIR sim, print the daily counts and plot them"""
+    sim = make_sim(profile=profile)
+    sim.run()
+    if profile:
+        profiler = sim.get_analyzer('profiler')
+        print(profiler.summary().to_string(float_format='{:,.3f}'.format))
+        os.makedirs('results/profiles', exist_ok=True)
+        profiler.to_df().to_csv('results/profiles/seir_steps.csv')
+        profiler.to_collapsed('results/profiles/seir.collapsed')
+        print("Profile saved to results/profiles/")
+    seir = sim.get_analyzer('seir') # Retrieve by label
+
+    # Explicitly print SEIR counts per day
+    print("Day\tSUS\tEXP\tINF (asymp+symp)\t\tRCV\tDTH\tTotal")
+    for t, S, E, I, I_asymp, I_symp, R, D in zip(seir.t, 
+                                seir.tracked_states['susceptible'], 
+                                seir.tracked_states['exposed'], 
+                                seir.tracked_states['infectious'], 
+                                seir.tracked_states['infectious_asym'], 
+                                seir.tracked_states['infectious_sym'], 
+                                seir.tracked_states['recovered'], 
+                                seir.tracked_states['dead']):
+        total = S + E + I + D
+        print(f"{t}\t{S:,}\t{E:,}\t{I:,} ({I_asymp}+{I_symp}) \t{R:,}\t{D:,}\t{total:,}")
+
+
+    seir.plot()
+    return sim
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the Baguio SEIR simulation')
+    parser.add_argument('--profile', action='store_true', help='Record a per-step time breakdown')
+    args = parser.parse_args()
+    run_seir(profile=args.profile)
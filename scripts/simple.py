@@ -4,10 +4,11 @@ import os
 
 # Add the project root to sys.path so Python can find utils
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from utils.save_results import save_raw, save_plots
+from utils.save_results import save_raw, save_plots, save_columns
 
 sim = cv.Sim()
 sim.run()
 fig = sim.plot()
 save_raw(sim, "simple")
-save_plots(fig, "simple")
\ No newline at end of file
+save_columns(sim, "simple")
+save_plots(fig, "simple")
\ No newline at end of file
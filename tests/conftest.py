@@ -0,0 +1,38 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add the project root and calibs folder to sys.path so Python can find utils and misfit
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT_DIR, os.path.join(ROOT_DIR, 'scripts', 'calibs')])
+import utils.observations as observations
+
+@pytest.fixture
+def synthetic_observations(tmp_path, monkeypatch):
+    """
+    Stand-in for data/baguio_raw.csv (not shipped with the repo): Poisson daily
+    cases and deaths over the schedule's dates, with a few missing days. The misfit
+    module is pointed at the resulting bundle for the duration of the test.
+    """
+    import misfit
+    rng = np.random.default_rng(0)
+    dates = pd.date_range('2020-03-01', '2022-04-30')
+    t = np.arange(len(dates))
+    df = pd.DataFrame(dict(
+        date=dates,
+        cases=rng.poisson(20 + 15 * np.sin(t / 60) ** 2),
+        deaths=rng.poisson(0.5, len(dates)),
+    ))
+    df = df.drop(index=[40, 41, 300])  # Gaps are filled with zeros
+    raw_path = tmp_path / 'baguio_raw.csv'
+    df.to_csv(raw_path, index=False)
+
+    monkeypatch.setattr(observations, 'CACHE_DIR', tmp_path / 'cache')
+    bundle = observations.load_observations(raw_path)
+    monkeypatch.setattr(misfit, 'load_observations', lambda: bundle)
+    misfit.get_misfit_window.cache_clear()
+    yield bundle
+    misfit.get_misfit_window.cache_clear()
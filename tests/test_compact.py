@@ -0,0 +1,54 @@
+import os
+import sys
+
+import covasim as cv
+import numpy as np
+
+# Add the project root and scripts folder to sys.path so Python can find utils and populate_baguio
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT_DIR, os.path.join(ROOT_DIR, 'scripts')])
+from utils.ages import CENSUS_AGE_BINS, BAGUIO_AGE_COUNTS
+from utils.compact import compact_population
+from utils.population import make_population_sim
+
+def check_compact(people):
+    for key in people.keys():
+        if isinstance(people[key], np.ndarray):
+            assert people[key].dtype.itemsize <= 4, key
+    for lkey, layer in people.contacts.items():
+        p1, p2 = layer['p1'].astype(np.int64), layer['p2'].astype(np.int64)
+        assert layer['p1'].dtype == np.int32 and layer['p2'].dtype == np.int32
+        assert np.all(p1 < p2), lkey  # (min, max) pairs, no self-contacts
+        assert len(np.unique(p1 * len(people) + p2)) == len(p1), lkey  # No duplicate edges
+
+def test_compact_small_population():
+    sim = make_population_sim(pars=dict(verbose=0, n_days=10), age_bins=CENSUS_AGE_BINS,
+                              age_weights=BAGUIO_AGE_COUNTS, pop_size=5000, n_households=1368)
+    sim.initialize()
+    n_edges = {lkey: len(layer) for lkey, layer in sim.people.contacts.items()}
+    report = compact_population(sim, verbose=False)
+    check_compact(sim.people)
+    assert all(len(sim.people.contacts[lkey]) <= n for lkey, n in n_edges.items())
+    assert report.loc['total', 'bytes'] == report['bytes'].drop('total').sum()
+    sim.run(verbose=0)  # Covasim runs on the compacted layers
+    assert sim.complete
+
+def test_compact_enforces_32bit():
+    sim = cv.Sim(pop_size=2000, n_days=10, verbose=0)
+    cv.options.set(precision=64)
+    try:
+        sim.initialize()
+        assert sim.people.rel_trans.dtype == np.float64
+        compact_population(sim, verbose=False)
+        assert cv.options.precision == 32
+        check_compact(sim.people)
+        sim.run(verbose=0)
+        assert sim.complete
+    finally:
+        cv.options.set(precision=32)
+
+def test_compact_baguio_population():
+    from populate_baguio import make_baguio_population
+    sim = make_baguio_population(compact=True)
+    assert len(sim.people) == 366358
+    check_compact(sim.people)
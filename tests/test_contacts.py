@@ -0,0 +1,41 @@
+import os
+import sys
+
+import numpy as np
+
+# Add the project root to sys.path so Python can find utils
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.contacts import ContactIndex, age_bin_index, contact_matrices
+
+def make_index():
+    contacts = {
+        'h': dict(p1=np.array([0, 0, 1, 3]), p2=np.array([1, 2, 2, 4])),
+        'c': dict(p1=np.array([0]), p2=np.array([5])),
+    }
+    return ContactIndex(contacts, n=6)
+
+def test_degree():
+    index = make_index()
+    assert index.degree().tolist() == [3, 2, 2, 1, 1, 1]
+    assert index.degree(0) == 3
+    assert index.degree([0, 4, 5], layer='h').tolist() == [2, 1, 0]
+    assert (index.degree(np.arange(6)) == index.degree()).all()
+
+def test_neighbors_and_k_hop():
+    index = make_index()
+    assert index.neighbors(0).tolist() == [1, 2, 5]
+    assert index.neighbors(0, 'h').tolist() == [1, 2]
+    assert index.k_hop(3, 2).tolist() == [4]
+
+def test_prem_age_bins():
+    ages = np.array([0, 4.99, 5, 74.9, 75, 99])
+    assert age_bin_index(ages).tolist() == [0, 0, 1, 14, 15, 15]  # Five-year bins, last one open (75+)
+
+def test_contact_matrices():
+    class People:
+        age = np.array([1.0, 2.0, 30.0, 31.0])
+        contacts = {'h': dict(p1=np.array([0, 0]), p2=np.array([1, 2]))}
+    matrix = contact_matrices(People())['h']
+    assert matrix.shape == (16, 16)
+    assert matrix[0, 0] == 1  # Both 0-4s have one 0-4 contact
+    assert matrix[0, 6] == 0.5 and matrix[6, 0] == 0.5  # One 0-4/30-34 edge, over two people in each bin
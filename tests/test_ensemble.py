@@ -0,0 +1,25 @@
+import os
+import sys
+
+import numpy as np
+
+# Add the calibs folder to sys.path so Python can find ensemble
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts', 'calibs')))
+from ensemble import StreamingQuantiles
+
+def test_zero_days_stay_zero():
+    stats = StreamingQuantiles(npts=3, max_value=10_000)
+    for run in range(20):
+        stats.add(np.array([0.0, 37.0 * run, 500.0]))
+    assert np.all(stats.quantile(0.5)[:1] == 0)
+    assert np.all(stats.quantile(0.975)[:1] == 0)
+
+def test_quantiles_close_to_exact():
+    rng = np.random.default_rng(0)
+    runs = rng.poisson(200, size=(500, 4)).astype(float)
+    stats = StreamingQuantiles(npts=4, max_value=10_000)
+    for values in runs:
+        stats.add(values)
+    for q in [0.025, 0.5, 0.975]:
+        assert np.allclose(stats.quantile(q), np.quantile(runs, q, axis=0), rtol=0.03)
+    assert np.allclose(stats.mean, runs.mean(axis=0))
@@ -0,0 +1,78 @@
+import os
+import sys
+
+import covasim as cv
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add the project root and calibs folder to sys.path so Python can find utils and misfit
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT_DIR, os.path.join(ROOT_DIR, 'scripts', 'calibs')])
+from misfit import MisfitWindow, calculate_simulation_misfit
+
+START, END = '2020-03-15', '2020-07-31'
+
+def reference_misfit(obs, cases, deaths, dates, start_date=None, end_date=None, until=None):
+    """
+    The original misfit: reindex the sim onto the observed dates, mask NaN smoothing
+    and normalize by the window's maxima. With until, only days up to it are summed.
+    """
+    sim_df = pd.DataFrame({'cases': cases, 'deaths': deaths}, index=dates)
+    sim_df = sim_df.reindex(obs.dates, fill_value=0)
+    keep = np.ones(len(obs.dates), dtype=bool)
+    if start_date is not None:
+        keep &= (obs.dates >= start_date) & (obs.dates <= end_date)
+    valid = keep & ~np.isnan(obs.smoothed_cases) & ~np.isnan(obs.smoothed_deaths)
+    obs_c, obs_d = obs.smoothed_cases[valid], obs.smoothed_deaths[valid]
+    sim_c, sim_d = sim_df['cases'].values[valid], sim_df['deaths'].values[valid]
+    err = np.abs(obs_c - sim_c) / max(obs_c.max(), 1) + np.abs(obs_d - sim_d) / max(obs_d.max(), 1)
+    if until is not None:
+        err = err[obs.dates[valid] <= until]
+    return np.sum(err)
+
+def make_sim(seed=1):
+    return cv.Sim(pop_size=5000, pop_infected=100, pop_scale=20, rescale=True, beta=0.02,
+                  start_day='2020-03-01', end_day='2020-06-30', rand_seed=seed, verbose=0)
+
+@pytest.fixture
+def sim(synthetic_observations):
+    sim = make_sim()
+    sim.run()
+    return sim
+
+def sim_arrays(sim, t=None):
+    return sim.results['new_infections'].values[:t], sim.results['new_deaths'].values[:t]
+
+def test_score_matches_reference(synthetic_observations, sim):
+    dates = pd.DatetimeIndex(sim.results['date'])
+    cases, deaths = sim_arrays(sim)
+    expected = reference_misfit(synthetic_observations, cases, deaths, dates)
+    assert calculate_simulation_misfit(sim) == pytest.approx(expected, rel=1e-12)
+    expected = reference_misfit(synthetic_observations, cases, deaths, dates, START, END)
+    assert MisfitWindow(START, END).score(sim) == pytest.approx(expected, rel=1e-12)
+
+def test_stacked_scores(synthetic_observations, sim):
+    window = MisfitWindow(START, END)
+    other = make_sim(seed=2)
+    other.run()
+    cases = np.stack([sim_arrays(s)[0] for s in (sim, other)])
+    deaths = np.stack([sim_arrays(s)[1] for s in (sim, other)])
+    stacked = window.score_arrays(cases, deaths, sim['start_day'])
+    assert stacked.shape == (2,)
+    assert stacked == pytest.approx([window.score(sim), window.score(other)], rel=1e-12)
+
+def test_score_partial_rescales(synthetic_observations, sim):
+    window = MisfitWindow(START, END)
+    paused = make_sim()
+    paused.run(until=60)
+    t = paused.t
+    assert paused.rescale_vec[:t].max() > paused.rescale_vec[:t].min()  # Dynamic rescaling kicked in
+
+    # Finalizing scales the completed days by rescale_vec, which the run never changes
+    # for past days, so the finished sim's first t days are what score_partial must see
+    cases, deaths = sim_arrays(sim, t)
+    dates = pd.DatetimeIndex(sim.results['date'][:t])
+    expected = reference_misfit(synthetic_observations, cases, deaths, dates, START, END, until=dates[-1])
+    assert window.score_partial(paused) == pytest.approx(expected, rel=1e-12)
+    assert window.score_partial(sim) == window.score(sim)
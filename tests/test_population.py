@@ -0,0 +1,32 @@
+import os
+import sys
+
+import numpy as np
+
+# Add the project root to sys.path so Python can find utils
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.ages import CENSUS_AGE_BINS, BAGUIO_AGE_COUNTS
+from utils.contacts import household_stats
+from utils.population import household_cluster_size, make_population_sim
+
+def make_small_sim(pop_size=2000, n_households=500, **pars):
+    sim = make_population_sim(pars=dict(verbose=0, rand_seed=1, **pars), age_bins=CENSUS_AGE_BINS,
+                              age_weights=BAGUIO_AGE_COUNTS, pop_size=pop_size, n_households=n_households)
+    sim.initialize()
+    return sim
+
+def test_small_population():
+    sim = make_small_sim()
+    assert len(sim.people) == 2000
+    assert list(sim.people.contacts.keys()) == ['h', 's', 'w', 'c']
+    assert all(len(layer) > 0 for layer in sim.people.contacts.values())
+    assert sim.people.age.min() >= 0 and sim.people.age.max() <= 101
+
+def test_household_count():
+    stats = household_stats(make_small_sim().people)
+    assert abs(stats['n_households'] - 500) < 0.1 * 500
+    assert stats['sizes'].sum() == 2000
+
+def test_household_cluster_size():
+    lam = household_cluster_size(3.5)
+    assert np.isclose(lam / (1 - np.exp(-lam)), 3.5)  # Mean size of the nonempty clusters
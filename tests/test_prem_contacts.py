@@ -0,0 +1,65 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add the project root and scripts folder to sys.path so Python can find utils and populate_baguio
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT_DIR, os.path.join(ROOT_DIR, 'scripts')])
+import utils.prem_contacts as prem_contacts
+from utils.ages import CENSUS_AGE_BINS, BAGUIO_AGE_COUNTS
+from utils.contacts import age_bin_index
+from utils.population import make_population_sim
+from utils.prem_contacts import PREM_LAYERS, PREM_VARIANTS, add_prem_layers, make_prem_edges, prem_distances
+
+# Mean daily contacts per person in the synthetic matrices, per setting
+CONTACTS_PER_PERSON = dict(all=20.0, home=3.0, others=8.0, school=6.0, work=4.0)
+
+def mixing_matrix(ages, contacts_per_person):
+    """Proportionate mixing: everyone spreads their contacts over the bins by bin size"""
+    shares = np.bincount(age_bin_index(ages), minlength=16) / len(ages)
+    return np.tile(contacts_per_person * shares, (16, 1))
+
+def expected_edges(ages, matrix):
+    counts = np.bincount(age_bin_index(ages), minlength=16)
+    return (counts[:, None] * matrix).sum() / 2  # Each edge is a contact for both ends
+
+def test_make_prem_edges():
+    ages = np.random.default_rng(0).uniform(0, 90, 20_000)
+    matrix = mixing_matrix(ages, 10.0)
+    p1, p2 = make_prem_edges(ages, matrix, rng=1)
+    assert p1.dtype == np.int32 and len(p1) == len(p2)
+    assert not np.any(p1 == p2)
+    assert np.isclose(len(p1), expected_edges(ages, matrix), rtol=0.03)
+
+def test_prem_layers_small_population():
+    sim = make_population_sim(pars=dict(verbose=0, contacts=dict(h=4, s=0, w=0, c=0)), age_bins=CENSUS_AGE_BINS,
+                              age_weights=BAGUIO_AGE_COUNTS, pop_size=5000, n_households=1368)
+    sim.initialize()
+    ages = sim.people.age
+    matrices = {variant: mixing_matrix(ages, CONTACTS_PER_PERSON[variant]) for variant in PREM_LAYERS.values()}
+    add_prem_layers(sim, matrices=matrices, rng=1)
+    for lkey, variant in PREM_LAYERS.items():
+        n_edges = len(sim.people.contacts[lkey])
+        assert np.isclose(n_edges, expected_edges(ages, matrices[variant]), rtol=0.05)
+        assert np.isclose(sim['contacts'][lkey], 2 * n_edges / len(ages))
+    distances = prem_distances(sim.people, matrices)
+    assert all(distance < 0.15 for distance in distances.values())
+
+def test_baguio_prem_end_to_end(tmp_path, monkeypatch, capsys):
+    import populate_baguio
+    matrix = np.full((16, 16), 1 / 16)  # Same age mix in every bin, scaled per setting below
+    for variant in PREM_VARIANTS:
+        pd.DataFrame(CONTACTS_PER_PERSON[variant] * matrix).to_csv(
+            tmp_path / f'contact_{variant}_PHL.csv', header=False, index=False)
+    monkeypatch.setattr(prem_contacts, 'PREM_DIR', tmp_path)
+    monkeypatch.setattr(populate_baguio, 'PREM_DIR', tmp_path)
+
+    sim = populate_baguio.make_baguio_population(prem=True)
+    ages = sim.people.age
+    for lkey, variant in PREM_LAYERS.items():
+        n_edges = len(sim.people.contacts[lkey])
+        assert np.isclose(n_edges, expected_edges(ages, CONTACTS_PER_PERSON[variant] * matrix), rtol=0.02)
+    assert len(sim.people.contacts['h']) > 0
+    assert 'Distance from Prem matrices: s=' in capsys.readouterr().out  # Printed whenever PREM_DIR exists
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+import sciris as sc
+
+# Add the project root and scripts folder to sys.path so Python can find utils and seir_counts
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT_DIR, os.path.join(ROOT_DIR, 'scripts')])
+from utils.schedule import duration_schedule
+from seir_counts import make_sim
+
+def test_seir_sim_runs():
+    sim = make_sim(pop_size=2000, verbose=0)
+    orig_dur = sc.dcp(sim['dur'])
+    sim.run()
+    assert sim.get_analyzer('seir').n_steps == sim.npts
+    assert sim['dur'] == orig_dur  # Restored when the sim finishes
+
+def test_unknown_duration_key():
+    bad = duration_schedule([dict(start_day=0, end_day=10, dur={'inf2rec': {'par1': 100.0}})])
+    sim = make_sim(pop_size=500, verbose=0)
+    sim['interventions'] = [bad]
+    with pytest.raises(KeyError, match='inf2rec'):
+        sim.initialize()
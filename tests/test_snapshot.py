@@ -0,0 +1,38 @@
+import os
+import sys
+
+import numpy as np
+import covasim as cv
+
+# Add the project root and calibs folder to sys.path so Python can find utils and ensemble
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT_DIR, os.path.join(ROOT_DIR, 'scripts', 'calibs')])
+from utils.snapshot import save_snapshot, make_snapshot_sim
+
+def save_small_snapshot(dirpath, pop_size=5000):
+    sim = cv.Sim(pop_size=pop_size, pop_type='hybrid', verbose=0)
+    sim.initialize()
+    return save_snapshot(sim, dirpath), sim.people
+
+def test_snapshot_sim_runs(tmp_path):
+    dirpath, people = save_small_snapshot(tmp_path / 'snapshot')
+    on_disk = np.load(dirpath / 'layer_h_p1.npy').copy()
+
+    sim = make_snapshot_sim(dirpath, pars=dict(n_days=30, pop_infected=20, verbose=0))
+    sim.run()
+    assert sim.complete
+    assert sim.results['cum_infections'][-1] > 20
+    assert isinstance(sim.people.age, np.memmap)
+    for layer in sim.people.contacts.values():
+        assert isinstance(layer['p1'], np.memmap) and isinstance(layer['p2'], np.memmap)
+    assert np.array_equal(sim.people.contacts['h']['p1'], people.contacts['h']['p1'])
+    assert np.array_equal(np.load(dirpath / 'layer_h_p1.npy'), on_disk)  # Copy-on-write: the files never change
+
+def test_ensemble_on_snapshot(tmp_path):
+    from ensemble import run_ensemble
+    dirpath, _ = save_small_snapshot(tmp_path / 'snapshot')
+    pars = dict(pop_type='hybrid', n_days=20, pop_infected=20)
+    bands = run_ensemble(pars, n_runs=3, n_workers=2, population=dirpath)
+    assert bands['n_runs'] == 3
+    assert len(bands['new_infections']['median']) == 21
+    assert bands['new_infections']['mean'].sum() > 0
@@ -0,0 +1,40 @@
+import os
+import sys
+
+import numpy as np
+
+# Add the project root and scripts folder to sys.path so Python can find utils and cli
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.extend([ROOT_DIR, os.path.join(ROOT_DIR, 'scripts')])
+from utils.ages import CENSUS_AGE_BINS, BAGUIO_AGE_COUNTS
+from utils.contacts import household_stats
+from utils.population import make_population_sim
+from utils.summary import PopulationSummary
+
+def test_summary_small_population(tmp_path):
+    sim = make_population_sim(pars=dict(verbose=0), age_bins=CENSUS_AGE_BINS,
+                              age_weights=BAGUIO_AGE_COUNTS, pop_size=5000, n_households=1368)
+    sim.initialize()
+    summary = PopulationSummary.from_sim(sim)
+    assert summary.n_agents == 5000
+    assert summary.age_counts.sum() == 5000
+    assert summary.n_male + summary.n_female == 5000
+    assert {lkey: layer['n_edges'] for lkey, layer in summary.layers.items()} == \
+           {lkey: len(layer) for lkey, layer in sim.people.contacts.items()}
+    assert summary.households['n_households'] == household_stats(sim.people)['n_households']
+
+    loaded = PopulationSummary.load(summary.save(tmp_path / 'summary.json'))
+    assert loaded.to_dict() == summary.to_dict()
+    diff = summary.diff(loaded)
+    assert diff['n_agents'] == 0
+    assert not np.any(diff['age_counts'])
+
+def test_cli_populate_summary(tmp_path):
+    from cli import make_parser
+    filepath = tmp_path / 'baguio.json'
+    args = make_parser().parse_args(['populate', 'baguio', '--summary', str(filepath)])
+    args.func(args)
+    summary = PopulationSummary.load(filepath)
+    assert summary.n_agents == 366358
+    assert set(summary.layers) == {'h', 's', 'w', 'c'}
+    assert abs(summary.households['n_households'] - 100220) < 0.01 * 100220
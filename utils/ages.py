@@ -0,0 +1,59 @@
+import numpy as np
+
+# 5-year census age bins, inclusive integer years; the open 80+ bin is capped at 100
+CENSUS_AGE_LABELS = [
+    '0-4', '5-9', '10-14', '15-19', '20-24', '25-29', '30-34', '35-39',
+    '40-44', '45-49', '50-54', '55-59', '60-64', '65-69', '70-74', '75-79', '80+'
+]
+
+# Baguio City population by age group
+BAGUIO_AGE_COUNTS = [
+    26573, 28840, 30713, 34527, 39461,
+    35642, 30818, 27658, 23055, 19413,
+    18170, 15460, 12362, 8581, 5461,
+    2985, 3432
+]
+
+def bins_from_labels(labels, max_age=100):
+    """Convert labels such as '0-4' and '80+' into inclusive (low, high) age bins"""
+    bins = []
+    for label in labels:
+        if label.endswith('+'):
+            bins.append((int(label[:-1]), max_age))
+        else:
+            low, high = label.split('-')
+            bins.append((int(low), int(high)))
+    return bins
+
+CENSUS_AGE_BINS = bins_from_labels(CENSUS_AGE_LABELS)
+
+def sample_ages(bins, weights, n=None, rng=None, integer=False):
+    """
+    Draw ages from census bins in one vectorized pass.
+
+    Args:
+        bins (list): inclusive (low, high) integer age ranges, e.g. CENSUS_AGE_BINS
+        weights (array): counts or proportions per bin
+        n (int): number of ages to draw; if None, weights are taken as exact counts
+        rng (int/Generator): seed or numpy Generator
+        integer (bool): return whole years instead of continuous ages
+
+    Returns:
+        numpy.ndarray: exactly n (or sum(weights)) ages, in random order
+    """
+    rng = np.random.default_rng(rng)
+    bins = np.asarray(bins, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    if n is None:
+        counts = weights.astype(np.int64)
+    else:
+        counts = rng.multinomial(int(n), weights / weights.sum())
+
+    lows = bins[:, 0]
+    widths = bins[:, 1] + 1 - lows  # e.g. 0-4 covers [0, 5)
+    bin_ids = np.repeat(np.arange(len(bins)), counts)
+    ages = lows[bin_ids] + widths[bin_ids] * rng.random(len(bin_ids))
+    if integer:
+        ages = np.floor(ages).astype(np.int64)
+    rng.shuffle(ages)  # Bins come out sorted; shuffle so neighbouring agents are not all the same age
+    return ages
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import covasim as cv
+
+# Downcasts applied to per-agent arrays; int64 ids/days and float64 attributes
+# (e.g. from a custom popdict) fit comfortably in 32 bits for any realistic population
+DOWNCASTS = {np.dtype(np.float64): np.float32, np.dtype(np.int64): np.int32}
+
+def use_32bit():
+    """
+    Make covasim allocate People and layer arrays as float32/int32 and compile its
+    kernels for them (its default unless overridden); compacted populations need it
+    """
+    if cv.options.precision != 32:
+        cv.options.set(precision=32)
+    return
+
+def compact_people(people):
+    """Downcast 64-bit per-agent arrays in place; returns the bytes saved"""
+    saved = 0
+    for key in people.keys():
+        arr = people[key]
+        if isinstance(arr, np.ndarray) and arr.dtype in DOWNCASTS:
+            people[key] = arr.astype(DOWNCASTS[arr.dtype])
+            saved += arr.nbytes - people[key].nbytes
+    return saved
+
+def dedupe_layer(layer, n=None):
+    """
+    Keep one copy of each undirected edge and drop self-contacts, in place.
+
+    Covasim already transmits along each stored edge in both directions, so
+    (i, j) and (j, i) are the same contact counted twice. Edges are stored as
+    (min, max) pairs with 32-bit indices; the first copy's beta is kept.
+    Returns the number of edges removed.
+    """
+    p1 = np.asarray(layer['p1'], dtype=np.int64)
+    p2 = np.asarray(layer['p2'], dtype=np.int64)
+    n = n if n is not None else int(max(p1.max(initial=0), p2.max(initial=0))) + 1
+    lo, hi = np.minimum(p1, p2), np.maximum(p1, p2)
+    _, first = np.unique(lo * n + hi, return_index=True)
+    keep = np.sort(first[lo[first] != hi[first]])  # Sorted to keep the original edge order
+
+    n_before = len(p1)
+    columns = dict(p1=lo[keep], p2=hi[keep])
+    for key in list(layer.keys()):
+        values = columns[key] if key in columns else np.asarray(layer[key])[keep]
+        if values.dtype in DOWNCASTS:
+            values = values.astype(DOWNCASTS[values.dtype])
+        layer[key] = values
+    return n_before - len(keep)
+
+def memory_report(people):
+    """Bytes used by the per-agent arrays and by each contact layer, as a DataFrame"""
+    rows = [dict(
+        component='people',
+        items=len(people),
+        bytes=sum(people[key].nbytes for key in people.keys() if isinstance(people[key], np.ndarray)),
+    )]
+    for lkey, layer in people.contacts.items():
+        rows.append(dict(
+            component=f'layer {lkey}',
+            items=len(layer),
+            bytes=sum(np.asarray(layer[key]).nbytes for key in layer.keys()),
+        ))
+    df = pd.DataFrame(rows).set_index('component')
+    df.loc['total'] = [np.nan, df['bytes'].sum()]
+    df['MB'] = df['bytes'] / 1e6
+    return df
+
+def compact_population(sim, dedupe=True, verbose=True):
+    """
+    Shrink an initialized sim's population in place: 32-bit per-agent arrays and
+    (optionally) deduplicated, 32-bit contact layers. Prints the memory before
+    and after when verbose; returns the report after compaction. Switches covasim
+    to 32-bit precision (see use_32bit) so later sims match the compacted arrays.
+    """
+    use_32bit()
+    people = sim.people
+    before = memory_report(people)
+    compact_people(people)
+    if dedupe:
+        for lkey, layer in people.contacts.items():
+            removed = dedupe_layer(layer, n=len(people))
+            if verbose and removed:
+                print(f"🧹 Layer {lkey}: removed {removed:,} duplicate or self contacts")
+    after = memory_report(people)
+    if verbose:
+        report = pd.DataFrame({'MB before': before['MB'], 'MB after': after['MB']})
+        print(f"\n💾 Population memory:\n{report.to_string(float_format='{:,.1f}'.format)}")
+    return after
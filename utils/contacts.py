@@ -0,0 +1,143 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+# Lower edges of the 16 five-year age bins used by the Prem et al. matrices (last bin 75+)
+PREM_BIN_EDGES = np.arange(0, 80, 5)
+
+def build_csr(p1, p2, n):
+    """
+    Symmetric CSR adjacency (indptr, indices) from an edge list, built in one pass.
+    Each edge is stored in both directions, so neighbors of i are
+    indices[indptr[i]:indptr[i+1]]. Indices are 32-bit when the population allows.
+    """
+    dtype = np.int32 if n < 2**31 else np.int64
+    p1 = np.asarray(p1, dtype=dtype)
+    p2 = np.asarray(p2, dtype=dtype)
+    src = np.concatenate([p1, p2])
+    dst = np.concatenate([p2, p1])
+    order = np.argsort(src, kind='stable')
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+    return indptr, dst[order]
+
+def gather_neighbors(indptr, indices, nodes):
+    """Concatenated neighbor lists of several nodes, without a Python loop"""
+    nodes = np.asarray(nodes, dtype=np.int64)
+    starts = indptr[nodes]
+    lengths = indptr[nodes + 1] - starts
+    total = lengths.sum()
+    if total == 0:
+        return indices[:0]
+    # Position of each output element within the indices array
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return indices[offsets + np.arange(total)]
+
+class ContactIndex:
+    """
+    Per-layer CSR index of a population's contacts for O(degree) neighbor, degree
+    and k-hop queries. Build it once from sim.people (or people.contacts plus the
+    number of agents) and reuse it in summaries, analyzers and interventions.
+    """
+
+    def __init__(self, people, layers=None, n=None):
+        contacts = getattr(people, 'contacts', people)
+        self.n = len(people) if n is None else n
+        self.layer_keys = list(layers) if layers is not None else list(contacts.keys())
+        self.csr = {}
+        for lkey in self.layer_keys:
+            self.csr[lkey] = build_csr(contacts[lkey]['p1'], contacts[lkey]['p2'], self.n)
+
+    def _layers(self, layer):
+        if layer is None:
+            return self.layer_keys
+        return [layer] if isinstance(layer, str) else list(layer)
+
+    def neighbors(self, i, layer=None):
+        """Sorted unique contacts of agent i in one layer, a list of layers, or all layers"""
+        found = [gather_neighbors(*self.csr[lkey], [i]) for lkey in self._layers(layer)]
+        return np.unique(np.concatenate(found))
+
+    def degree(self, i=None, layer=None):
+        """
+        Number of contact edges per agent (or for agent/agents i), summed over the chosen
+        layers. For given agents only their indptr entries are read, so the cost is O(len(i)).
+        """
+        if i is None:
+            return sum(np.diff(self.csr[lkey][0]) for lkey in self._layers(layer))
+        i = np.asarray(i)
+        return sum(self.csr[lkey][0][i + 1] - self.csr[lkey][0][i] for lkey in self._layers(layer))
+
+    def k_hop(self, i, k, layer=None):
+        """Agents reachable from i within k hops, excluding i itself"""
+        seen = np.zeros(self.n, dtype=bool)
+        seen[i] = True
+        frontier = np.atleast_1d(i)
+        for _ in range(k):
+            found = np.concatenate([gather_neighbors(*self.csr[lkey], frontier) for lkey in self._layers(layer)])
+            frontier = np.unique(found[~seen[found]])
+            if not len(frontier):
+                break
+            seen[frontier] = True
+        seen[i] = False
+        return np.flatnonzero(seen)
+
+def age_bin_index(ages, bin_edges=PREM_BIN_EDGES):
+    """Bin of each age given the bins' lower edges; the last bin is open-ended"""
+    return np.clip(np.searchsorted(bin_edges, ages, side='right') - 1, 0, len(bin_edges) - 1)
+
+def contact_matrices(people, layers=None, bin_edges=PREM_BIN_EDGES):
+    """
+    Empirical age-contact matrix per layer, in the Prem convention: entry [i, j] is
+    the mean number of contacts a person in bin i has with people in bin j. Each
+    edge counts for both of its ends, so every layer is one bincount over its edges.
+
+    Args:
+        people (People): e.g. sim.people; needs .age and .contacts
+        layers (list): layer keys (default: all)
+        bin_edges (array): lower edges of the age bins (default: Prem's 16 five-year bins)
+
+    Returns:
+        dict: {layer: (n_bins, n_bins) array}
+    """
+    n = len(bin_edges)
+    bins = age_bin_index(people.age, bin_edges)
+    counts = np.bincount(bins, minlength=n)
+    per_person = np.where(counts > 0, counts, 1)[:, None]
+    matrices = {}
+    for lkey in (layers if layers is not None else people.contacts.keys()):
+        layer = people.contacts[lkey]
+        pair = bins[layer['p1']] * n + bins[layer['p2']]
+        totals = np.bincount(pair, minlength=n * n).reshape(n, n)
+        matrices[lkey] = (totals + totals.T) / per_person  # Both directions of every edge
+    return matrices
+
+def matrix_distance(empirical, reference):
+    """Relative Frobenius distance ||E - R|| / ||R|| between two contact matrices"""
+    reference = np.asarray(reference, dtype=float)
+    norm = np.linalg.norm(reference)
+    return np.linalg.norm(np.asarray(empirical) - reference) / (norm if norm > 0 else 1)
+
+def household_stats(people, layer='h', n=None):
+    """
+    Households as the connected components of a layer's edge graph, found with a
+    sparse connected-components pass over p1/p2. Agents without household contacts
+    are single-person households.
+
+    Returns:
+        dict: n_households, household_id (per agent), sizes (per household),
+        size_histogram (number of households of each size, indexed by size) and mean_size
+    """
+    contacts = getattr(people, 'contacts', people)
+    n = len(people) if n is None else n
+    p1, p2 = contacts[layer]['p1'], contacts[layer]['p2']
+    graph = sp.csr_matrix((np.ones(len(p1), dtype=np.int8), (p1, p2)), shape=(n, n))
+    n_households, household_id = connected_components(graph, directed=False)
+    sizes = np.bincount(household_id, minlength=n_households)
+    return dict(
+        n_households=n_households,
+        household_id=household_id,
+        sizes=sizes,
+        size_histogram=np.bincount(sizes),
+        mean_size=n / n_households if n_households else 0.0,
+    )
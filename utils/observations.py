@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import shutil
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .schedule import ROOT_DIR, SCHEDULE_FILE, load_schedule, schedule_periods
+
+RAW_FILE = ROOT_DIR / 'data/baguio_raw.csv'
+CACHE_DIR = ROOT_DIR / 'data/cache/observations'
+SMOOTH_WINDOW = 7
+SERIES = ['cases', 'deaths', 'smoothed_cases', 'smoothed_deaths']
+
+def smooth(data, window=SMOOTH_WINDOW):
+    """Centered rolling mean; the first and last window//2 days are NaN"""
+    return pd.Series(data).rolling(window=window, center=True).mean().to_numpy()
+
+def source_hash(paths, window=SMOOTH_WINDOW):
+    """sha256 of the source files' bytes and the smoothing window"""
+    digest = hashlib.sha256(f'window={window}'.encode())
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def build_bundle(bundle_dir, raw_path=RAW_FILE, schedule_path=SCHEDULE_FILE, window=SMOOTH_WINDOW, key=None):
+    """
+    Parse and smooth the raw CSV once and write one .npy file per series plus a
+    manifest with the date range and each schedule period's index range.
+    """
+    df = pd.read_csv(raw_path, parse_dates=['date'])
+    df = df.set_index('date').sort_index()
+    dates = pd.date_range(start=df.index.min(), end=df.index.max())
+    df = df.reindex(dates, fill_value=0)  # Continuous daily index; missing days count as zero
+
+    series = dict(cases=df['cases'].to_numpy(dtype=float), deaths=df['deaths'].to_numpy(dtype=float))
+    series['smoothed_cases'] = smooth(series['cases'], window)
+    series['smoothed_deaths'] = smooth(series['deaths'], window)
+
+    periods = {}
+    for name, (start_date, end_date) in schedule_periods(load_schedule(schedule_path)).items():
+        start = max((pd.Timestamp(start_date) - dates[0]).days, 0)
+        stop = min((pd.Timestamp(end_date) - dates[0]).days + 1, len(dates))  # End date is inclusive
+        periods[name] = [start, max(start, stop)]
+
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+    for name in SERIES:
+        np.save(bundle_dir / f'{name}.npy', series[name])
+    manifest = dict(
+        key=key,
+        source=str(raw_path),
+        start_date=str(dates[0].date()),
+        n_days=len(dates),
+        smooth_window=window,
+        series=SERIES,
+        periods=periods,
+    )
+    with open(bundle_dir / 'manifest.json', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+class ObservationBundle:
+    """
+    Read-only view of a built observation bundle. Series are memory-mapped on first
+    access, so opening a bundle parses nothing but the small manifest.
+    """
+
+    def __init__(self, bundle_dir):
+        self.bundle_dir = bundle_dir
+        with open(bundle_dir / 'manifest.json') as f:
+            self.manifest = json.load(f)
+        self.start_date = pd.Timestamp(self.manifest['start_date'])
+        self.n_days = self.manifest['n_days']
+        self.periods = {name: slice(*bounds) for name, bounds in self.manifest['periods'].items()}
+        self._arrays = {}
+
+    def __getattr__(self, name):
+        if name in SERIES:
+            if name not in self._arrays:
+                self._arrays[name] = np.load(self.bundle_dir / f'{name}.npy', mmap_mode='r')
+            return self._arrays[name]
+        raise AttributeError(name)
+
+    @property
+    def dates(self):
+        return pd.date_range(self.start_date, periods=self.n_days)
+
+    def index_of(self, date):
+        """Position of a date in the daily series (may fall outside it)"""
+        return (pd.Timestamp(date) - self.start_date).days
+
+    def window(self, start_date, end_date):
+        """Slice of the series covering the inclusive date range, clipped to the observations"""
+        start = min(max(self.index_of(start_date), 0), self.n_days)
+        stop = min(max(self.index_of(end_date) + 1, start), self.n_days)
+        return slice(start, stop)
+
+    def period(self, start_date, end_date=None):
+        """
+        Dates and all series for a schedule period name or an inclusive date range,
+        as views into the mapped arrays.
+        """
+        if end_date is None:
+            sl = self.periods[start_date]
+        else:
+            sl = self.window(start_date, end_date)
+        out = {name: getattr(self, name)[sl] for name in SERIES}
+        out['dates'] = self.dates[sl]
+        return out
+
+    def to_frame(self):
+        return pd.DataFrame({name: np.asarray(getattr(self, name)) for name in SERIES},
+                            index=pd.Index(self.dates, name='date'))
+
+@lru_cache(maxsize=None)
+def load_observations(raw_path=RAW_FILE, schedule_path=SCHEDULE_FILE, window=SMOOTH_WINDOW):
+    """
+    The observation bundle for the current source CSVs, built on first use. Bundles
+    live under data/cache/observations/<content hash>, so editing either CSV (or the
+    smoothing window) builds a new one and stale bundles are never read.
+    """
+    key = source_hash([raw_path, schedule_path], window)
+    bundle_dir = CACHE_DIR / key[:16]
+    if not (bundle_dir / 'manifest.json').exists():
+        # Build in a private folder and move it into place, so parallel workers never see a partial bundle
+        tmp_dir = CACHE_DIR / f'{key[:16]}.{os.getpid()}.tmp'
+        build_bundle(tmp_dir, raw_path, schedule_path, window, key=key)
+        try:
+            tmp_dir.rename(bundle_dir)
+        except OSError:  # Another process got there first
+            shutil.rmtree(tmp_dir)
+    return ObservationBundle(bundle_dir)
@@ -0,0 +1,68 @@
+import numpy as np
+import covasim as cv
+import sciris as sc
+from .ages import sample_ages
+
+def household_cluster_size(mean_size, n_iter=50):
+    """
+    Poisson mean for cv.make_microstructured_contacts() that gives households of
+    mean_size people on average. Covasim drops the clusters that draw size 0, so
+    the mean of the nonempty ones is lam/(1 - exp(-lam)); solve that for lam.
+    """
+    if mean_size <= 1:
+        raise ValueError(f'Mean household size must be greater than 1, not {mean_size}')
+    lam = mean_size
+    for _ in range(n_iter):  # Fixed point of lam = mean_size*(1 - exp(-lam)), a contraction near the root
+        lam = mean_size * (1 - np.exp(-lam))
+    return lam
+
+def make_popdict(ages, contacts, male_ratio=0.5, n_households=None, seed=None):
+    """
+    Covasim popdict (uid, age, sex, hybrid contact layers) built once from custom
+    demographics, so the contact layers are generated from the same ages the
+    people end up with.
+
+    Args:
+        ages (array): one age per agent
+        contacts (dict): contacts per layer, e.g. sim['contacts']; for 'h' this is covasim's Poisson household cluster size
+        male_ratio (float): probability that an agent is male (sex=1, covasim's convention)
+        n_households (int): target number of households; sets contacts['h'] so households average len(ages)/n_households people
+        seed (int): random seed for sexes and contact layers
+    """
+    ages = np.asarray(ages, dtype=cv.defaults.default_float)
+    pop_size = len(ages)
+    contacts = sc.dcp(contacts)
+    if n_households:
+        contacts['h'] = household_cluster_size(pop_size / n_households)
+
+    rng = np.random.default_rng(seed)
+    cv.set_seed(seed)  # Covasim's contact generators draw from the global RNG
+    layers = cv.make_hybrid_contacts(pop_size, ages, contacts)
+
+    popdict = {}
+    popdict['uid'] = np.arange(pop_size, dtype=cv.defaults.default_int)
+    popdict['age'] = ages
+    popdict['sex'] = rng.binomial(1, male_ratio, pop_size)
+    popdict['contacts'] = layers
+    popdict['layer_keys'] = list(layers.keys())
+    popdict['microstructure'] = 'hybrid'
+    return popdict, contacts
+
+def make_population_sim(pars=None, ages=None, age_bins=None, age_weights=None, pop_size=None,
+                        male_ratio=0.5, n_households=None, **kwargs):
+    """
+    Create a hybrid cv.Sim whose people and contact layers are built exactly once,
+    during sim initialization, from custom ages (or census bins), sex ratio and
+    household target.
+    """
+    pars = sc.mergedicts(pars)
+    if ages is None:
+        ages = sample_ages(age_bins, age_weights, n=pop_size, rng=pars.get('rand_seed', 1))
+    pars['pop_size'] = len(ages)
+    pars['pop_type'] = 'hybrid'
+    sim = cv.Sim(pars, **kwargs)
+    popdict, contacts = make_popdict(ages, sim['contacts'], male_ratio=male_ratio,
+                                     n_households=n_households, seed=sim['rand_seed'])
+    sim['contacts'] = contacts
+    sim.popdict = popdict  # Picked up by cv.make_people() when the sim initializes
+    return sim
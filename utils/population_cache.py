@@ -0,0 +1,66 @@
+from collections import OrderedDict
+import covasim as cv
+import sciris as sc
+from .compact import compact_population
+
+def make_population_key(pars):
+    """Cache key for the parameters that determine how a population is built"""
+    return (
+        int(pars['pop_size']),
+        pars.get('pop_type', 'random'),
+        pars.get('location'),
+        pars.get('rand_seed', 1),
+    )
+
+def build_people(pars, compact=False):
+    """Build a People object with no epidemic state (no seeded infections)"""
+    sim = cv.Sim(pars=pars)
+    sim.initialize(init_infections=False)
+    if compact:
+        compact_population(sim, verbose=False)
+    return sim.people
+
+class PopulationCache:
+    """
+    LRU cache of prebuilt populations keyed by (pop_size, pop_type, location, seed).
+
+    Each cached People object is kept pristine; callers get a copy, so every sim
+    starts from a clean epidemic state without rebuilding ages and contact layers.
+    With compact=True the cached populations use 32-bit arrays and deduplicated
+    contact layers (see utils.compact).
+    """
+
+    def __init__(self, maxsize=4, compact=False):
+        self.maxsize = maxsize
+        self.compact = compact
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._cache)
+
+    def get_people(self, pars):
+        """Return a fresh copy of the People for these pars, building them only on a miss"""
+        key = make_population_key(pars)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._cache[key] = build_people(pars, compact=self.compact)
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)  # Evict the least recently used population
+
+        people = sc.dcp(self._cache[key])
+        people.set_pars(dict(pars))  # Copy so the caller's dict is not filled with defaults
+        return people
+
+    def make_sim(self, pars, **kwargs):
+        """Create a cv.Sim that reuses a cached population instead of building one"""
+        return cv.Sim(pars=pars, people=self.get_people(pars), **kwargs)
+
+    def clear(self):
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
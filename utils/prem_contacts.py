@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import covasim as cv
+
+from .schedule import ROOT_DIR
+from .contacts import PREM_BIN_EDGES, age_bin_index, contact_matrices, matrix_distance
+
+PREM_DIR = ROOT_DIR / 'data/from_prem_et_al'
+PREM_VARIANTS = ['all', 'home', 'others', 'school', 'work']
+
+# Prem et al. use 16 five-year bins; the last one is open (75+)
+PREM_AGE_LABELS = [
+    '0-4', '5-9', '10-14', '15-19', '20-24', '25-29', '30-34', '35-39',
+    '40-44', '45-49', '50-54', '55-59', '60-64', '65-69', '70-74', '75+'
+]
+
+# Covasim layer -> Prem setting
+PREM_LAYERS = {'s': 'school', 'w': 'work', 'c': 'others'}
+
+def load_prem_matrices(variants=PREM_VARIANTS, dirpath=None):
+    """
+    {variant: 16x16 array} from contact_<variant>_PHL.csv in dirpath (default PREM_DIR).
+    Entry [i, j] is the mean number of daily contacts a person in age bin i has with
+    people in age bin j.
+    """
+    dirpath = PREM_DIR if dirpath is None else dirpath
+    return {variant: pd.read_csv(dirpath / f'contact_{variant}_PHL.csv', header=None).to_numpy(dtype=float)
+            for variant in variants}
+
+def prem_distances(people, matrices=None, layers=PREM_LAYERS):
+    """Relative Frobenius distance between each layer's empirical contact matrix and its Prem matrix"""
+    if matrices is None:
+        matrices = load_prem_matrices(set(layers.values()))
+    empirical = contact_matrices(people, layers=list(layers.keys()))
+    return {lkey: matrix_distance(empirical[lkey], matrices[variant]) for lkey, variant in layers.items()}
+
+def make_prem_edges(ages, matrix, rng=None):
+    """
+    Age-assortative undirected edge list matching a Prem matrix in expectation.
+
+    The expected number of edges between bins i and j is the contacts those bins
+    report with each other, averaged over both directions so the result is
+    symmetric; edges within a bin count for both ends. Edge counts for all bin
+    pairs are drawn in one Poisson call, then each edge's ends are picked
+    uniformly from the members of its two bins. Self-contacts are dropped.
+
+    Returns:
+        (p1, p2): int32 arrays of agent indices
+    """
+    rng = np.random.default_rng(rng)
+    bins = age_bin_index(ages, PREM_BIN_EDGES[:len(matrix)])
+    counts = np.bincount(bins, minlength=len(matrix))
+    contacts = counts[:, None] * np.asarray(matrix, dtype=float)  # Total contacts reported by bin i with bin j
+    expected = (contacts + contacts.T) / 2
+    expected[counts == 0, :] = expected[:, counts == 0] = 0  # No edges to a bin without members
+    pair_i, pair_j = np.triu_indices(len(matrix))
+    mean_edges = np.where(pair_i == pair_j, expected[pair_i, pair_j] / 2, expected[pair_i, pair_j])
+    n_edges = rng.poisson(mean_edges)
+
+    # Agents grouped by bin, so the members of bin b are members[starts[b]:starts[b] + counts[b]]
+    members = np.argsort(bins, kind='stable')
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    edge_i = np.repeat(pair_i, n_edges)
+    edge_j = np.repeat(pair_j, n_edges)
+    p1 = members[starts[edge_i] + (rng.random(len(edge_i)) * counts[edge_i]).astype(np.int64)]
+    p2 = members[starts[edge_j] + (rng.random(len(edge_j)) * counts[edge_j]).astype(np.int64)]
+    keep = p1 != p2
+    return p1[keep].astype(np.int32), p2[keep].astype(np.int32)
+
+def add_prem_layers(sim, matrices=None, layers=PREM_LAYERS, rng=None):
+    """
+    Replace an initialized sim's layers (s, w and c by default) with Prem-matrix
+    edge lists, and set sim['contacts'] to the resulting mean contacts per agent.
+    """
+    if matrices is None:
+        matrices = load_prem_matrices(set(layers.values()))
+    rng = np.random.default_rng(rng if rng is not None else sim['rand_seed'])
+    people = sim.people
+    for lkey, variant in layers.items():
+        p1, p2 = make_prem_edges(people.age, matrices[variant], rng)
+        beta = np.ones(len(p1), dtype=cv.defaults.default_float)
+        people.contacts[lkey] = cv.Layer(p1=p1, p2=p2, beta=beta, label=lkey)
+        sim['contacts'][lkey] = 2 * len(p1) / len(people)  # Each edge is a contact for both ends
+    return sim
@@ -0,0 +1,135 @@
+import time
+import numpy as np
+import pandas as pd
+import covasim as cv
+
+# People methods timed as their own components; whatever else the step does
+# (mostly transmission: computing viral loads and drawing infections) is 'transmission'
+PEOPLE_METHODS = {
+    'update_states_pre': 'people:update_states',
+    'update_contacts':   'people:update_contacts',
+    'infect':            'people:infect',
+}
+
+class Profiler(cv.Analyzer):
+    """
+    Opt-in per-step profiler. Add it to a sim's analyzers to record the wall-clock
+    time of every step, split into each intervention's apply, each analyzer's apply,
+    people updates and infection; the unattributed remainder is 'transmission'.
+
+    Timing wrappers are installed at initialization and removed in finalize(), so
+    the sim can still be saved or copied afterwards. Overhead is two perf_counter
+    calls per component per step.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs) # This is necessary to initialize the class properly
+        self.components = []
+        self.times = None
+        self.n_steps = 0
+        return
+
+    def initialize(self, sim):
+        super().initialize()
+        self._sim = sim
+        self._wrapped = []  # (container, key, original) triples to restore in finalize
+        self.components = []
+
+        for i, intervention in enumerate(sim['interventions']):
+            if isinstance(intervention, cv.Intervention):
+                self._wrap(intervention, 'apply', f'intervention:{intervention.label or type(intervention).__name__}')
+            else:  # Plain function interventions are replaced in the list
+                name = f'intervention:{getattr(intervention, "__name__", "function")}'
+                sim['interventions'][i] = self._timed(intervention, self._add_component(name))
+                self._wrapped.append((sim['interventions'], i, intervention))
+
+        for analyzer in sim['analyzers']:
+            if analyzer is self or not isinstance(analyzer, cv.Analyzer):
+                continue
+            self._wrap(analyzer, 'apply', f'analyzer:{analyzer.label or type(analyzer).__name__}')
+
+        sim.people.unlock()  # People refuses new attributes while locked
+        for method, name in PEOPLE_METHODS.items():
+            self._wrap(sim.people, method, name)
+        sim.people.lock()
+
+        # The whole step, so that time not covered by a component is attributed too
+        self._step_index = len(self.components)
+        self._wrap(sim, 'step', 'step')
+
+        self.times = np.zeros((sim.npts, len(self.components)))
+        self.n_steps = 0
+        return
+
+    def _add_component(self, name):
+        self.components.append(name)
+        return len(self.components) - 1
+
+    def _timed(self, func, index):
+        def timed(*args, **kwargs):
+            t = self._sim.t
+            start = time.perf_counter()
+            out = func(*args, **kwargs)
+            self.times[t, index] += time.perf_counter() - start
+            return out
+        return timed
+
+    def _wrap(self, obj, attr, name):
+        index = self._add_component(name)
+        setattr(obj, attr, self._timed(getattr(obj, attr), index))
+        self._wrapped.append((obj, attr, None))
+        return
+
+    def apply(self, sim):
+        self.n_steps = sim.t + 1
+        return
+
+    def finalize(self, sim=None):
+        super().finalize()
+        for obj, key, orig in self._wrapped:
+            if orig is not None:
+                obj[key] = orig
+            elif hasattr(obj, 'unlock'):  # People
+                obj.unlock()
+                delattr(obj, key)
+                obj.lock()
+            else:
+                delattr(obj, key)  # Falls back to the class method
+        self._wrapped = []
+        self._sim = None
+        return
+
+    def to_df(self):
+        """Per-step table: one column per component, plus 'transmission' (the rest) and 'step' (the total)"""
+        times = self.times[:self.n_steps]
+        df = pd.DataFrame(np.delete(times, self._step_index, axis=1),
+                          columns=[c for i, c in enumerate(self.components) if i != self._step_index])
+        df['transmission'] = times[:, self._step_index] - df.sum(axis=1)
+        df['step'] = times[:, self._step_index]
+        df.index.name = 't'
+        return df
+
+    def summary(self):
+        """Total seconds and share of step time per component, largest first"""
+        df = self.to_df()
+        totals = df.drop(columns='step').sum()
+        return pd.DataFrame({
+            'seconds': totals,
+            'percent': 100 * totals / df['step'].sum(),
+        }).sort_values('seconds', ascending=False)
+
+    def to_collapsed(self, filepath=None):
+        """
+        Collapsed-stack text ('sim.step;component microseconds' per line) for
+        flamegraph.pl, speedscope and similar tools. Written to filepath if given.
+        """
+        totals = self.to_df().drop(columns='step').sum()
+        lines = []
+        for component, seconds in totals.items():
+            frames = ['sim.step'] + component.replace(';', ',').split(':')
+            lines.append(f"{';'.join(frames)} {int(round(seconds * 1e6))}")
+        text = '\n'.join(lines) + '\n'
+        if filepath is not None:
+            with open(filepath, 'w') as f:
+                f.write(text)
+        return text
@@ -1,5 +1,7 @@
 import json
 import os
+import zipfile
+import numpy as np
 from pathlib import Path
 from datetime import datetime
 
@@ -7,11 +9,17 @@ from datetime import datetime
 ROOT_DIR = Path(__file__).resolve().parents[1]
 RAW_DIR = ROOT_DIR / 'results/raw'
 FIG_DIR = ROOT_DIR / 'results/figures'
+COLUMNS_DIR = ROOT_DIR / 'results/columns'
 os.makedirs(RAW_DIR, exist_ok=True)
 os.makedirs(FIG_DIR, exist_ok=True)
+os.makedirs(COLUMNS_DIR, exist_ok=True)
 
 now = datetime.now().strftime("%m%d-%H%M")
 
+# Sim parameters stored alongside each run's columns
+META_PARS = ['start_day', 'end_day', 'n_days', 'pop_size', 'pop_scale', 'pop_type',
+             'location', 'rand_seed', 'beta', 'rel_death_prob']
+
 def save_raw(sim, label):
     filename = f'{label}_{now}.json'
     filepath = RAW_DIR / filename
@@ -22,4 +30,51 @@ def save_plots(fig, label):
   filename = f'{label}_{now}.png'
   filepath = FIG_DIR / filename
   fig.savefig(filepath)
-  print(f"Simulation plot saved to {filepath}")
\ No newline at end of file
+  print(f"Simulation plot saved to {filepath}")
+
+def save_columns(sim, label, run=None, keys=None, metadata=None, filepath=None):
+    """
+    Append one run's result time series to a compressed columnar archive
+    (results/columns/<label>.npz by default). Each series is its own .npy member,
+    so many runs can share one file and single columns load without parsing the rest.
+    """
+    filepath = Path(filepath) if filepath else COLUMNS_DIR / f'{label}.npz'
+    keys = keys if keys is not None else sim.result_keys()
+    if run is None:
+        run = f"{sim['rand_seed']}_{datetime.now().strftime('%m%d-%H%M%S%f')}"
+
+    meta = {key: sim.pars.get(key) for key in META_PARS}
+    meta.update(metadata or {})
+    meta.update(run=run, label=sim.label, keys=list(keys))
+
+    with zipfile.ZipFile(filepath, mode='a', compression=zipfile.ZIP_DEFLATED) as zf:
+        if f'{run}/meta.json' in zf.namelist():
+            raise ValueError(f"Run '{run}' already exists in {filepath}")
+        for key in keys:
+            with zf.open(f'{run}/{key}.npy', mode='w', force_zip64=True) as f:
+                np.lib.format.write_array(f, np.asarray(sim.results[key].values), allow_pickle=False)
+        zf.writestr(f'{run}/meta.json', json.dumps(meta, default=str))
+    return filepath
+
+def list_runs(filepath):
+    """Run names stored in a columnar archive, in the order they were saved"""
+    with zipfile.ZipFile(filepath) as zf:
+        return [name[:-len('/meta.json')] for name in zf.namelist() if name.endswith('/meta.json')]
+
+def load_meta(filepath, run):
+    with zipfile.ZipFile(filepath) as zf:
+        return json.loads(zf.read(f'{run}/meta.json'))
+
+def load_column(filepath, key, run=None):
+    """
+    Load one result series. With a run name, returns that run's 1-D array;
+    otherwise stacks the series of every run into an (n_runs, n_days) array.
+    """
+    with zipfile.ZipFile(filepath) as zf:
+        runs = [run] if run is not None else [name[:-len('/meta.json')] for name in zf.namelist()
+                                              if name.endswith('/meta.json')]
+        columns = []
+        for name in runs:
+            with zf.open(f'{name}/{key}.npy') as f:
+                columns.append(np.lib.format.read_array(f, allow_pickle=False))
+    return columns[0] if run is not None else np.vstack(columns)
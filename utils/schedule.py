@@ -0,0 +1,160 @@
+import csv
+import numpy as np
+import covasim as cv
+import sciris as sc
+from pathlib import Path
+
+# Automatically find the root dir (two levels up from this utils file)
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SCHEDULE_FILE = ROOT_DIR / 'data/quarantine_schedule.csv'
+
+def load_schedule(filepath=SCHEDULE_FILE):
+    """
+    Read the Baguio quarantine timeline: one row per period with its label,
+    inclusive start/end dates, beta multiplier, affected layers and plot color.
+    """
+    with open(filepath, newline='') as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        row['beta_change'] = float(row['beta_change'])
+        row['layers'] = row['layers'].split()
+    return rows
+
+def schedule_periods(schedule=None):
+    """{period: (start_date, end_date)} for every row of the schedule"""
+    schedule = schedule if schedule is not None else load_schedule()
+    return {row['period']: (row['start_date'], row['end_date']) for row in schedule}
+
+# Calibration windows that are not plain schedule rows: the first year as one merged
+# window, and only the first two weeks of AL1
+CALIBRATION_WINDOWS = {
+    'merged_1': ('2020-03-02', '2021-03-02'),
+    'al1': ('2022-03-02', '2022-03-15'),
+}
+
+def calibration_periods(schedule=None, windows=CALIBRATION_WINDOWS):
+    """
+    {period: (start_date, end_date)} for calibration and plotting: every schedule
+    period, with the windows above replacing a period of the same name or, for new
+    names, added in front.
+    """
+    scheduled = schedule_periods(schedule)
+    extra = {name: window for name, window in windows.items() if name not in scheduled}
+    return {**extra, **{name: windows.get(name, window) for name, window in scheduled.items()}}
+
+def schedule_milestones(schedule=None):
+    """(start_date, end_date, label, color) tuples for shading plots"""
+    schedule = schedule if schedule is not None else load_schedule()
+    return [(row['start_date'], row['end_date'], row['label'], row['color']) for row in schedule]
+
+def compile_beta_schedule(schedule, start_day, npts, layers):
+    """
+    Precompute the (npts, n_layers) beta multiplier for every sim day. Days outside
+    all periods keep a multiplier of 1; later rows win where periods overlap.
+    """
+    start_day = sc.date(start_day)
+    multipliers = np.ones((npts, len(layers)))
+    for row in schedule:
+        first = max((sc.date(row['start_date']) - start_day).days, 0)
+        last = min((sc.date(row['end_date']) - start_day).days + 1, npts)  # End date is inclusive
+        if first >= last:
+            continue
+        cols = [i for i, lkey in enumerate(layers) if lkey in row['layers']]
+        multipliers[first:last, cols] = row['beta_change']
+    return multipliers
+
+class beta_schedule(cv.Intervention):
+    """
+    Apply the whole quarantine timeline as one intervention. The schedule is compiled
+    into a per-day, per-layer beta array at initialization, so each step is a single
+    lookup no matter how many quarantine levels are modelled.
+
+    Args:
+        schedule (list): rows from load_schedule(); defaults to data/quarantine_schedule.csv
+        layers (list): layers to control; defaults to all of the sim's layers
+    """
+
+    def __init__(self, schedule=None, layers=None, **kwargs):
+        super().__init__(**kwargs)
+        self.schedule = schedule if schedule is not None else load_schedule()
+        self.layers = layers
+        return
+
+    def initialize(self, sim):
+        super().initialize()
+        if self.layers is None:
+            self.layers = list(sim['beta_layer'].keys())
+        orig_betas = np.array([sim['beta_layer'][lkey] for lkey in self.layers])
+        self.betas = compile_beta_schedule(self.schedule, sim['start_day'], sim.npts, self.layers) * orig_betas
+        # Only write to the sim on days where a layer's beta actually changes
+        self.changed = np.ones(sim.npts, dtype=bool)
+        self.changed[1:] = np.any(self.betas[1:] != self.betas[:-1], axis=1)
+        return
+
+    def apply(self, sim):
+        if self.changed[sim.t]:
+            for lkey, beta in zip(self.layers, self.betas[sim.t]):
+                sim['beta_layer'][lkey] = beta
+        return
+
+class duration_schedule(cv.Intervention):
+    """
+    Switch disease-duration distributions (sim['dur']) by period. Each period gives
+    inclusive start/end days (dates or sim days) and overrides for some duration keys,
+    e.g. {'mild2rec': {'dist': 'normal', 'par1': 100.0, 'par2': 2.0}}; overrides may be
+    partial and periods may overlap (later periods win). Keys must already be in
+    sim['dur'] (exp2inf, inf2sym, ..., crit2die).
+
+    Every distinct combination of active periods is resolved into a full duration set
+    at initialization, so each step is one lookup. Covasim then samples the durations
+    of all agents infected that step in one vectorized draw. The sim's own originals
+    are restored whenever no period is active and when the sim finishes.
+
+    Args:
+        periods (list): dicts with 'start_day', 'end_day' and 'dur'
+    """
+
+    def __init__(self, periods, **kwargs):
+        super().__init__(**kwargs)
+        self.periods = periods
+        return
+
+    def initialize(self, sim):
+        super().initialize()
+        self.orig_dur = sc.dcp(sim['dur'])
+        for period in self.periods:
+            unknown = [key for key in period['dur'] if key not in self.orig_dur]
+            if unknown:
+                errormsg = f'Unknown duration key(s) {unknown}; valid keys are {list(self.orig_dur.keys())}'
+                raise sc.KeyNotFoundError(errormsg)
+        active = np.zeros((sim.npts, len(self.periods)), dtype=bool)
+        for i, period in enumerate(self.periods):
+            first = max(sim.day(period['start_day']), 0)
+            last = min(sim.day(period['end_day']) + 1, sim.npts)
+            active[first:last, i] = True
+
+        # One regime per distinct set of active periods; the all-inactive regime is the originals
+        combos, self.regime_by_day = np.unique(active, axis=0, return_inverse=True)
+        self.regime_by_day = self.regime_by_day.reshape(-1)
+        self.regimes = []
+        for combo in combos:
+            dur = sc.dcp(self.orig_dur)
+            for i in np.flatnonzero(combo):
+                for key, override in self.periods[i]['dur'].items():
+                    dur[key] = sc.mergedicts(dur[key], override)
+            self.regimes.append(dur)
+        self.current = None
+        return
+
+    def apply(self, sim):
+        regime = self.regime_by_day[sim.t]
+        if regime != self.current:
+            sim['dur'].update(sc.dcp(self.regimes[regime]))  # Copies, so the sim never shares the regime's dicts
+            self.current = regime
+        return
+
+    def finalize(self, sim=None):
+        super().finalize()
+        if sim is not None:
+            sim['dur'].update(sc.dcp(self.orig_dur))
+        return
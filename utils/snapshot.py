@@ -0,0 +1,83 @@
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+import covasim as cv
+
+# Per-agent arrays that define the population and never change during a run; every
+# other People array is epidemic state, rebuilt fresh (and writable) on load
+STATIC_KEYS = ['uid', 'age', 'sex']
+
+def save_snapshot(people, dirpath, static_keys=STATIC_KEYS):
+    """
+    Write a population as raw .npy blocks plus manifest.json: the static per-agent
+    arrays, and every column (p1, p2, beta) of every contact layer. Accepts a
+    People object or an initialized sim.
+    """
+    people = getattr(people, 'people', people)
+    dirpath = Path(dirpath)
+    tmp_dir = dirpath.with_name(dirpath.name + '.tmp')
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    arrays = {}
+    for key in static_keys:
+        arrays[key] = f'people_{key}.npy'
+        np.save(tmp_dir / arrays[key], np.asarray(people[key]))
+    layers = {}
+    for lkey, layer in people.contacts.items():
+        layers[lkey] = {}
+        for col in layer.keys():
+            layers[lkey][col] = f'layer_{lkey}_{col}.npy'
+            np.save(tmp_dir / layers[lkey][col], np.asarray(layer[col]))
+
+    manifest = dict(
+        pop_size=len(people),
+        pars={key: people.pars.get(key) for key in ['pop_type', 'location', 'rand_seed']},
+        arrays=arrays,
+        layers=layers,
+    )
+    with open(tmp_dir / 'manifest.json', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    if dirpath.exists():
+        shutil.rmtree(dirpath)
+    tmp_dir.rename(dirpath)  # Readers never see a half-written snapshot
+    return dirpath
+
+def load_manifest(dirpath):
+    with open(Path(dirpath) / 'manifest.json') as f:
+        return json.load(f)
+
+def load_people(dirpath, pars=None):
+    """
+    People backed by a snapshot. Static arrays and contact layers are memory-mapped
+    copy-on-write, so every process that loads the same snapshot shares one physical
+    copy through the page cache until it writes to a page; epidemic-state arrays are
+    freshly allocated. Writes stay private to the process and never reach the files.
+    (Read-only maps cannot be used: covasim's numba kernels reject read-only arrays.)
+    """
+    dirpath = Path(dirpath)
+    manifest = load_manifest(dirpath)
+    pars = dict(pars or {}, pop_size=manifest['pop_size'])
+    people = cv.People(pars)  # Allocates only the (fresh) epidemic-state arrays
+
+    for key, filename in manifest['arrays'].items():
+        people[key] = np.load(dirpath / filename, mmap_mode='c')
+
+    contacts = cv.Contacts(layer_keys=list(manifest['layers'].keys()))
+    for lkey, columns in manifest['layers'].items():
+        layer = cv.Layer(label=lkey)
+        for col, filename in columns.items():
+            layer[col] = np.load(dirpath / filename, mmap_mode='c')  # Direct assignment, so no copy
+        contacts[lkey] = layer
+    people.contacts = contacts
+    return people
+
+def make_snapshot_sim(dirpath, pars=None, **kwargs):
+    """cv.Sim over a snapshot population; pop_size and pop_type come from the snapshot"""
+    manifest = load_manifest(dirpath)
+    pars = dict(pars or {})
+    pars.update(pop_size=manifest['pop_size'], pop_type=manifest['pars']['pop_type'])
+    return cv.Sim(pars=pars, people=load_people(dirpath, pars), **kwargs)
@@ -0,0 +1,151 @@
+import json
+import numpy as np
+
+from .ages import CENSUS_AGE_LABELS, CENSUS_AGE_BINS
+from .contacts import household_stats
+
+class PopulationSummary:
+    """
+    Summary statistics of a population, computed with a handful of bincounts over
+    the People arrays: age histogram (raw and pop_scale-scaled), sex counts,
+    per-layer degree distributions and household sizes.
+
+    Only small arrays are kept, so summaries of multi-million-agent populations
+    can be saved as JSON, loaded back and diffed against each other.
+
+    Args:
+        people (People): e.g. sim.people
+        pop_scale (float): agents-to-people scale factor for the scaled histogram
+        age_bins (list): inclusive (low, high) bins; the last bin is open-ended
+        age_labels (list): one label per bin
+        household_layer (str): layer whose connected components are households (None to skip)
+    """
+
+    def __init__(self, people=None, pop_scale=1.0, age_bins=CENSUS_AGE_BINS, age_labels=CENSUS_AGE_LABELS,
+                 household_layer='h'):
+        if people is None:  # Empty summary, filled by from_dict()
+            return
+        ages = np.asarray(people.age)
+        n = len(ages)
+        lows = np.array([low for low, _ in age_bins], dtype=float)
+        age_index = np.clip(np.searchsorted(lows, ages, side='right') - 1, 0, len(lows) - 1)
+
+        self.n_agents = n
+        self.pop_scale = float(pop_scale)
+        self.age_labels = list(age_labels)
+        self.age_counts = np.bincount(age_index, minlength=len(lows))
+        self.scaled_age_counts = self.age_counts * self.pop_scale
+        self.age_percentiles = np.percentile(ages, [0, 25, 50, 75, 100]) if n else np.zeros(5)
+        self.mean_age = float(ages.mean()) if n else 0.0
+
+        sex_counts = np.bincount(np.asarray(people.sex, dtype=np.int64), minlength=2)
+        self.n_female, self.n_male = int(sex_counts[0]), int(sex_counts[1])  # Covasim: sex 1 is male
+
+        self.layers = {}
+        for lkey, layer in people.contacts.items():
+            degree = np.bincount(layer['p1'], minlength=n) + np.bincount(layer['p2'], minlength=n)
+            self.layers[lkey] = dict(
+                n_edges=len(layer),
+                mean_degree=float(degree.mean()) if n else 0.0,
+                degree_histogram=np.bincount(degree),
+            )
+
+        self.households = None
+        if household_layer is not None and household_layer in people.contacts:
+            stats = household_stats(people, layer=household_layer, n=n)
+            self.households = dict(
+                n_households=int(stats['n_households']),
+                mean_size=float(stats['mean_size']),
+                size_histogram=stats['size_histogram'],
+            )
+
+    @classmethod
+    def from_sim(cls, sim, **kwargs):
+        return cls(sim.people, pop_scale=sim['pop_scale'], **kwargs)
+
+    @property
+    def sex_ratio(self):
+        """Males per female"""
+        return self.n_male / self.n_female if self.n_female else np.nan
+
+    @property
+    def age_shares(self):
+        """Percentage of agents in each age bin"""
+        return 100 * self.age_counts / max(self.n_agents, 1)
+
+    def to_dict(self):
+        def plain(value):
+            if isinstance(value, np.ndarray):
+                return value.tolist()
+            if isinstance(value, dict):
+                return {k: plain(v) for k, v in value.items()}
+            if isinstance(value, np.generic):
+                return value.item()
+            return value
+        return {key: plain(value) for key, value in self.__dict__.items()}
+
+    @classmethod
+    def from_dict(cls, data):
+        summary = cls()
+        for key, value in data.items():
+            setattr(summary, key, value)
+        summary.age_counts = np.asarray(summary.age_counts)
+        summary.scaled_age_counts = np.asarray(summary.scaled_age_counts)
+        summary.age_percentiles = np.asarray(summary.age_percentiles)
+        for layer in summary.layers.values():
+            layer['degree_histogram'] = np.asarray(layer['degree_histogram'])
+        if summary.households is not None:
+            summary.households['size_histogram'] = np.asarray(summary.households['size_histogram'])
+        return summary
+
+    def save(self, filepath):
+        with open(filepath, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return filepath
+
+    @classmethod
+    def load(cls, filepath):
+        with open(filepath) as f:
+            return cls.from_dict(json.load(f))
+
+    def diff(self, other):
+        """
+        Differences (other - self) of every number and array the two summaries share.
+        Histograms of different lengths are zero-padded first.
+        """
+        def delta(a, b):
+            if isinstance(a, dict) and isinstance(b, dict):
+                return {k: delta(a[k], b[k]) for k in a.keys() & b.keys()}
+            if isinstance(a, (list, np.ndarray)) and isinstance(b, (list, np.ndarray)):
+                try:
+                    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+                except ValueError:  # Labels
+                    return None
+                size = max(len(a), len(b))
+                return np.pad(b, (0, size - len(b))) - np.pad(a, (0, size - len(a)))
+            if isinstance(a, (int, float)) and isinstance(b, (int, float)) and not isinstance(a, bool):
+                return b - a
+            return None
+        mine, theirs = self.to_dict(), other.to_dict()
+        out = {key: delta(mine[key], theirs[key]) for key in mine.keys() & theirs.keys()}
+        return {key: value for key, value in out.items() if value is not None}
+
+    def report(self, scaled=False):
+        """Print the summary"""
+        print(f"\n📊 Total agents: {self.n_agents:,}" +
+              (f" (scaled: {self.n_agents * self.pop_scale:,.0f} people)" if scaled else ''))
+        print(f"👶 Age percentiles (min, Q1, median, Q3, max): {np.round(self.age_percentiles, 1)}")
+        print(f"🧑 Avg age: {self.mean_age:.2f}")
+        print(f"👫 Males: {self.n_male:,}, 👭 Females: {self.n_female:,} (ratio {self.sex_ratio:.3f})")
+
+        counts = self.scaled_age_counts if scaled else self.age_counts
+        print("\n📊 Age Group Counts:")
+        for label, count, share in zip(self.age_labels, counts, self.age_shares):
+            print(f"{label}: {count:,.0f} people ({share:.2f}%)")
+
+        print("\n🔗 Contacts per layer:")
+        for lkey, layer in self.layers.items():
+            print(f"{lkey}: {layer['n_edges']:,} edges, mean degree {layer['mean_degree']:.2f}")
+
+        if self.households is not None:
+            print(f"\n🏠 Households: {self.households['n_households']:,} (mean size {self.households['mean_size']:.2f})")